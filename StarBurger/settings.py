@@ -15,6 +15,9 @@ SECRET_KEY = os.environ.get('SECRET_KEY', 'Replace me')
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.environ.get('DEBUG', 'False').lower() in ['true', 'yes', 'y']
 
+# Dev-only apps are not even imported unless turned on, production workers boot faster
+DEBUG_TOOLBAR = os.environ.get('DEBUG_TOOLBAR', str(DEBUG)).lower() in ['true', 'yes', 'y']
+
 ALLOWED_HOSTS = []
 
 INSTALLED_APPS = [
@@ -26,11 +29,11 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'debug_toolbar',
     'rest_framework',
 ]
 
 MIDDLEWARE = [
+    'foodcartapp.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -38,9 +41,12 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 ROOT_URLCONF = 'StarBurger.urls'
 
 DEBUG_TOOLBAR_PANELS = [
@@ -89,9 +95,28 @@ DATABASES = {
 
 CACHES = {
     'default': {
+        'BACKEND': 'foodcartapp.cache.TieredCache',
+        'LOCATION': 'default',
+        'OPTIONS': {
+            'SHARED_CACHE': 'shared',
+            'LOCAL_TIMEOUT': int(os.environ.get('LOCAL_CACHE_TIMEOUT', 10)),
+            'LOCAL_MAX_ENTRIES': int(os.environ.get('LOCAL_CACHE_MAX_ENTRIES', 1000)),
+        },
+    },
+    'shared': {
         'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
         'LOCATION': 'coords_cache',
-    }
+    },
+    # Places table is shared already, found coordinates are only kept in memory
+    'places': {
+        'BACKEND': 'foodcartapp.cache.TieredCache',
+        'LOCATION': 'places',
+        'OPTIONS': {
+            'SHARED_CACHE': None,
+            'LOCAL_TIMEOUT': 5 * 60,
+            'LOCAL_MAX_ENTRIES': 10000,
+        },
+    },
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -131,4 +156,40 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "bundles"),
 ]
 
+# Geocoders asked one by one until an address is found, see foodcartapp.geocoders
+GEOCODER_BACKENDS = os.environ.get(
+    'GEOCODER_BACKENDS', 'foodcartapp.geocoders.YandexGeocoder'
+).split(',')
+GEOCODER_GAZETTEER_PATH = os.environ.get('GEOCODER_GAZETTEER_PATH',
+                                         os.path.join(BASE_DIR, 'gazetteer.tsv'))
+GEOCODER_FIXTURE_PATH = os.environ.get('GEOCODER_FIXTURE_PATH')
 GEOCODER_KEY = os.environ.get('GEOCODER_KEY')
+GEOCODER_URL = os.environ.get('GEOCODER_URL', 'https://geocode-maps.yandex.ru/1.x')
+GEOCODER_TIMEOUT = float(os.environ.get('GEOCODER_TIMEOUT', 5))
+GEOCODER_MAX_WORKERS = int(os.environ.get('GEOCODER_MAX_WORKERS', 10))
+# Seconds to wait before geocoding a not found address again
+GEOCODER_NOT_FOUND_TTL = int(os.environ.get('GEOCODER_NOT_FOUND_TTL', 6 * 60 * 60))
+# Backoff of failed geocoding, the delay is doubled on every failure up to the max
+GEOCODER_RETRY_DELAY = int(os.environ.get('GEOCODER_RETRY_DELAY', 60))
+GEOCODER_MAX_RETRY_DELAY = int(os.environ.get('GEOCODER_MAX_RETRY_DELAY', 6 * 60 * 60))
+# Limits shared by all geocoding workers, see foodcartapp.models.GeocoderQuota,
+# by default no more calls are made at once than the rate limit allows per second
+GEOCODER_RATE_LIMIT = float(os.environ.get('GEOCODER_RATE_LIMIT', 10))
+GEOCODER_BURST = int(os.environ.get('GEOCODER_BURST', max(int(GEOCODER_RATE_LIMIT), 1)))
+GEOCODER_DAILY_QUOTA = int(os.environ.get('GEOCODER_DAILY_QUOTA', 1000))
+
+# Restaurants shown for an order on the manager page, see OrderRestaurantQuerySet.refresh
+NEAREST_RESTAURANTS_COUNT = int(os.environ.get('NEAREST_RESTAURANTS_COUNT', 5))
+# Kilometers, no limit by default
+MAX_DELIVERY_DISTANCE = float(os.environ.get('MAX_DELIVERY_DISTANCE', 'inf'))
+
+IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', 24 * 60 * 60))
+
+# Max number of SQL queries per view, see foodcartapp.profiling.ProfilingMiddleware
+QUERY_BUDGETS = {
+    'product_list_api': 10,
+    'register_order': 10,
+    'view_orders': 15,
+    'view_products': 15,
+}
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT', 'False').lower() in ['true', 'yes', 'y']
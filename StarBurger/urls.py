@@ -13,7 +13,7 @@ urlpatterns = [
     path('manager/', include('restaurateur.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
-if settings.DEBUG:
+if settings.DEBUG_TOOLBAR:
     import debug_toolbar
     urlpatterns = [
         path(r'__debug__/', include(debug_toolbar.urls)),
@@ -5,7 +5,7 @@ from django.utils.http import url_has_allowed_host_and_scheme
 from django.shortcuts import reverse, redirect
 
 from .models import (Restaurant, Product, RestaurantMenuItem, ProductCategory,
-                     Order, OrderProduct)
+                     Order, OrderProduct, OrderRestaurant, Place, GeocoderQuota)
 
 
 class RestaurantMenuItemInline(admin.TabularInline):
@@ -29,6 +29,10 @@ class RestaurantAdmin(admin.ModelAdmin):
         RestaurantMenuItemInline
     ]
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        Place.objects.enqueue([obj.address])
+
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
@@ -121,6 +125,14 @@ class OrderAdmin(admin.ModelAdmin):
     inlines = [
         OrderProductInline
     ]
+    readonly_fields = [
+        'total_price',
+    ]
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        form.instance.update_total_price()
+        OrderRestaurant.objects.refresh(order_ids=[form.instance.id])
 
     def response_change(self, request, obj):
         if 'next' in request.GET:
@@ -131,3 +143,36 @@ class OrderAdmin(admin.ModelAdmin):
                 return redirect('/')
         else:
             return super(OrderAdmin, self).response_change(request, obj)
+
+
+@admin.register(Place)
+class PlaceAdmin(admin.ModelAdmin):
+    search_fields = [
+        'address',
+    ]
+    list_display = [
+        'address',
+        'lat',
+        'lon',
+        'status',
+        'fetched_at',
+        'attempts',
+        'retry_at',
+    ]
+    list_filter = [
+        'status',
+    ]
+
+
+@admin.register(GeocoderQuota)
+class GeocoderQuotaAdmin(admin.ModelAdmin):
+    list_display = [
+        'day',
+        'calls',
+    ]
+    readonly_fields = [
+        'day',
+        'calls',
+        'tokens',
+        'tokens_updated_at',
+    ]
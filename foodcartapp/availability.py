@@ -0,0 +1,107 @@
+from collections import defaultdict
+
+
+class MenusMasks:
+    """Menus of restaurants as bitmasks of available products.
+
+    Products get dense bit positions in the order they are met on menus,
+    so the length of masks depends on the number of products on the menus
+    rather than on their ids.
+
+    Attributes:
+        masks: dict of restaurant_id: menu bitmask
+    """
+    def __init__(self, restaurants_products):
+        """Build masks of the menus.
+
+        Args:
+            restaurants_products: dict of restaurant_id: iterable of
+                available product ids
+        """
+        self._products_bits = {}
+        self.masks = {}
+        for restaurant_id, product_ids in restaurants_products.items():
+            mask = 0
+            for product_id in product_ids:
+                bit = self._products_bits.setdefault(product_id, len(self._products_bits))
+                mask |= 1 << bit
+            self.masks[restaurant_id] = mask
+
+    def get_products_mask(self, product_ids):
+        """Get bitmask of the products, None if any of them is on no menu."""
+        mask = 0
+        for product_id in product_ids:
+            bit = self._products_bits.get(product_id)
+            if bit is None:
+                return None
+            mask |= 1 << bit
+        return mask
+
+
+def fetch_menus_masks(restaurant_ids=None) -> MenusMasks:
+    """Fetch menus of restaurants with available products from the database.
+
+    Every restaurant menu is a bitmask, so checking if a restaurant can cook
+    an order is a single bitwise operation, see find_capable_restaurants.
+
+    Args:
+        restaurant_ids: already loaded restaurants, all restaurants by default
+    """
+    from .models import Restaurant, RestaurantMenuItem
+
+    if restaurant_ids is None:
+        restaurant_ids = list(Restaurant.objects.values_list('id', flat=True))
+    available_products = defaultdict(list)
+    menu_items = RestaurantMenuItem.objects.filter(restaurant__in=restaurant_ids, availability=True) \
+        .values_list('restaurant', 'product')
+    for restaurant_id, product_id in menu_items:
+        available_products[restaurant_id].append(product_id)
+    return MenusMasks({
+        restaurant_id: available_products[restaurant_id] for restaurant_id in restaurant_ids
+    })
+
+
+def find_capable_restaurants(orders_products, menus_masks) -> dict:
+    """Find restaurants which menu covers every product of the order.
+
+    Args:
+        orders_products: dict of order_id: iterable of product ids
+        menus_masks: menus of restaurants, see fetch_menus_masks
+
+    Returns:
+        capable_restaurants: dict of order_id: list of restaurant ids
+    """
+    capable_restaurants = {}
+    for order_id, product_ids in orders_products.items():
+        order_mask = menus_masks.get_products_mask(product_ids)
+        if order_mask is None:
+            capable_restaurants[order_id] = []
+            continue
+        capable_restaurants[order_id] = [
+            restaurant_id for restaurant_id, menu_mask in menus_masks.masks.items()
+            if order_mask & menu_mask == order_mask
+        ]
+    return capable_restaurants
+
+
+def get_availability_matrix(product_ids, restaurant_ids) -> bytearray:
+    """Get availability of every product in every restaurant with one query.
+
+    Returns:
+        matrix: bytearray with a row of len(restaurant_ids) items for each
+            product, item is 1 if the product is available in the restaurant
+    """
+    from .models import RestaurantMenuItem
+
+    products_rows = {product_id: row for row, product_id in enumerate(product_ids)}
+    restaurants_columns = {
+        restaurant_id: column for column, restaurant_id in enumerate(restaurant_ids)
+    }
+    row_size = len(restaurants_columns)
+    matrix = bytearray(len(products_rows) * row_size)
+    menu_items = RestaurantMenuItem.objects.filter(availability=True) \
+        .values_list('product', 'restaurant')
+    for product_id, restaurant_id in menu_items:
+        if product_id in products_rows and restaurant_id in restaurants_columns:
+            matrix[products_rows[product_id] * row_size + restaurants_columns[restaurant_id]] = 1
+    return matrix
@@ -0,0 +1,167 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.dummy import DummyCache
+
+from .profiling import record_cache_lookup
+
+
+_local_caches = {}
+_local_caches_lock = threading.Lock()
+
+_no_shared_cache = DummyCache('', {})
+
+
+class LocalLRUCache:
+    """Thread-safe in-process LRU cache with expiring entries."""
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys) -> dict:
+        now = time.monotonic()
+        values = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, pickled_value = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                values[key] = pickled_value
+        return {key: pickle.loads(pickled_value) for key, pickled_value in values.items()}
+
+    def set_many(self, data, expires_at):
+        # values are pickled as in LocMemCache, so callers can't mutate cached ones
+        pickled_data = {
+            key: pickle.dumps(value, pickle.HIGHEST_PROTOCOL) for key, value in data.items()
+        }
+        with self._lock:
+            for key, pickled_value in pickled_data.items():
+                self._entries[key] = (expires_at, pickled_value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def get_local_cache(name, max_entries) -> LocalLRUCache:
+    with _local_caches_lock:
+        if name not in _local_caches:
+            _local_caches[name] = LocalLRUCache(max_entries)
+        return _local_caches[name]
+
+
+class TieredCache(BaseCache):
+    """In-process LRU cache in front of a shared cache.
+
+    Reads are served from process memory when possible and fall back to
+    the shared cache, writes go to both. Other processes keep values they
+    have already read for up to LOCAL_TIMEOUT seconds, so values changed
+    in place should be read from the shared tier, see `shared`.
+
+    Options:
+        SHARED_CACHE: alias of the shared cache in CACHES setting, None to
+            keep values in process memory only
+        LOCAL_TIMEOUT: seconds to keep a value in process memory
+        LOCAL_MAX_ENTRIES: max number of values kept in process memory
+    """
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = options.get('SHARED_CACHE', 'shared')
+        self._local_timeout = options.get('LOCAL_TIMEOUT', 10)
+        self._local = get_local_cache(location, options.get('LOCAL_MAX_ENTRIES', 1000))
+
+    @property
+    def shared(self):
+        """Tier shared between processes, for values read fresh on every request."""
+        if self.shared_alias is None:
+            return _no_shared_cache
+        return caches[self.shared_alias]
+
+    def _get_local_expiry(self, timeout):
+        expires_at = time.monotonic() + self._local_timeout
+        timeout = self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+        if timeout is not None:
+            expires_at = min(expires_at, time.monotonic() + timeout)
+        return expires_at
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keys = {self.make_key(key, version): key for key in keys}
+        for key in keys:
+            self.validate_key(key)
+        local_values = self._local.get_many(keys)
+        missing_keys = [keys[key] for key in keys if key not in local_values]
+        shared_values = self.shared.get_many(missing_keys, version) if missing_keys else {}
+        if shared_values:
+            self._local.set_many({
+                self.make_key(key, version): value for key, value in shared_values.items()
+            }, self._get_local_expiry(None))
+        record_cache_lookup(hits=len(local_values) + len(shared_values),
+                            misses=len(missing_keys) - len(shared_values))
+
+        values = {keys[key]: value for key, value in local_values.items()}
+        values.update(shared_values)
+        return values
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed_keys = self.shared.set_many(data, timeout, version) or []
+        if timeout is not None and timeout is not DEFAULT_TIMEOUT and timeout <= 0:
+            self._local.delete_many([self.make_key(key, version) for key in data])
+            return failed_keys
+        self._local.set_many({
+            self.make_key(key, version): value
+            for key, value in data.items() if key not in failed_keys
+        }, self._get_local_expiry(timeout))
+        return failed_keys
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version)
+        if added:
+            self._local.set_many({self.make_key(key, version): value},
+                                 self._get_local_expiry(timeout))
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._local.delete_many([self.make_key(key, version)])
+        return self.shared.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        self._local.delete_many([self.make_key(key, version)])
+        return self.shared.delete(key, version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self._local.delete_many([self.make_key(key, version) for key in keys])
+        self.shared.delete_many(keys, version)
+
+    def has_key(self, key, version=None):
+        return bool(self._local.get_many([self.make_key(key, version)])) or \
+            self.shared.has_key(key, version)
+
+    def clear(self):
+        self._local.clear()
+        self.shared.clear()
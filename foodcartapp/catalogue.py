@@ -0,0 +1,70 @@
+import hashlib
+import time
+import uuid
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from rest_framework.renderers import JSONRenderer
+
+from .cache import TieredCache
+
+
+VERSION_KEY = 'product_catalogue:version'
+CATALOGUE_KEY = 'product_catalogue:{}'
+CATALOGUE_TIMEOUT = 24 * 60 * 60
+
+
+def _render_catalogue() -> dict:
+    from .models import Product
+    from .serializers import ProductSerializer
+
+    products = Product.objects.select_related('category').available()
+    content = JSONRenderer().render(ProductSerializer(products, many=True).data)
+    return {
+        'content': content,
+        'etag': hashlib.md5(content).hexdigest(),
+        'last_modified': int(time.time()),
+    }
+
+
+def get_product_catalogue() -> dict:
+    """Get catalogue of available products rendered to JSON.
+
+    Catalogue is rendered once per version and kept in cache. Reset of
+    the catalogue starts a new version, so a catalogue rendered from
+    outdated data is never served after the reset. Rendered catalogues
+    never change and are kept in process memory, the version is read
+    from the shared cache tier by every request, see get_catalogue_version.
+
+    Returns:
+        catalogue: dict with JSON `content` bytes, its `etag` and
+            `last_modified` timestamp
+    """
+    catalogue_key = CATALOGUE_KEY.format(get_catalogue_version())
+    catalogue = cache.get(catalogue_key)
+    if catalogue is None:
+        catalogue = _render_catalogue()
+        cache.set(catalogue_key, catalogue, CATALOGUE_TIMEOUT)
+    return catalogue
+
+
+def _get_version_cache():
+    # the version is changed in place, a copy in process memory would be
+    # outdated in every process but the one which has reset it
+    default_cache = caches[DEFAULT_CACHE_ALIAS]
+    if isinstance(default_cache, TieredCache):
+        return default_cache.shared
+    return default_cache
+
+
+def get_catalogue_version():
+    """Get version of products, restaurants and their menus."""
+    version = _get_version_cache().get(VERSION_KEY)
+    if version is None:
+        version = reset_product_catalogue()
+    return version
+
+
+def reset_product_catalogue():
+    version = uuid.uuid4().hex
+    _get_version_cache().set(VERSION_KEY, version, None)
+    return version
@@ -0,0 +1,70 @@
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0088
+WGS84_MAJOR_AXIS_KM = 6378.137
+WGS84_FLATTENING = 1 / 298.257223563
+# Max relative error of distances over the sphere against the ellipsoid
+HAVERSINE_MAX_ERROR = 0.006
+
+
+def _to_radians(coords):
+    coords = np.radians(np.asarray(coords, dtype=float).reshape(-1, 2))
+    return coords[:, 0], coords[:, 1]
+
+
+def _get_central_angles(lats_from, lons_from, lats_to, lons_to):
+    """Haversine central angles between points, in radians."""
+    haversines = np.sin((lats_to - lats_from) / 2) ** 2 + \
+        np.cos(lats_from) * np.cos(lats_to) * np.sin((lons_to - lons_from) / 2) ** 2
+    return 2 * np.arcsin(np.sqrt(np.clip(haversines, 0, 1)))
+
+
+def _get_distances(lats_from, lons_from, lats_to, lons_to, accurate):
+    if not accurate:
+        return EARTH_RADIUS_KM * _get_central_angles(lats_from, lons_from, lats_to, lons_to)
+
+    # Lambert's formula works with reduced latitudes
+    lats_from = np.arctan((1 - WGS84_FLATTENING) * np.tan(lats_from))
+    lats_to = np.arctan((1 - WGS84_FLATTENING) * np.tan(lats_to))
+    angles = _get_central_angles(lats_from, lons_from, lats_to, lons_to)
+
+    p = (lats_from + lats_to) / 2
+    q = (lats_to - lats_from) / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = (angles - np.sin(angles)) * np.sin(p) ** 2 * np.cos(q) ** 2 / np.cos(angles / 2) ** 2
+        y = (angles + np.sin(angles)) * np.cos(p) ** 2 * np.sin(q) ** 2 / np.sin(angles / 2) ** 2
+        distances = WGS84_MAJOR_AXIS_KM * (angles - WGS84_FLATTENING / 2 * (x + y))
+    return np.where(angles > 0, distances, 0.0)
+
+
+def get_distance_matrix(coords_from, coords_to, accurate=False) -> np.ndarray:
+    """Calculate distances between every pair of points at once.
+
+    Default mode uses haversine formula on a sphere, its error is up to
+    HAVERSINE_MAX_ERROR. Accurate mode uses Lambert's formula on WGS-84
+    ellipsoid, its error is about 10 meters for delivery distances.
+
+    Args:
+        coords_from: sequence of (lat, lon) of n points
+        coords_to: sequence of (lat, lon) of m points
+        accurate: use ellipsoid instead of sphere
+
+    Returns:
+        distances: n x m array of distances in kilometers
+    """
+    lats_from, lons_from = _to_radians(coords_from)
+    lats_to, lons_to = _to_radians(coords_to)
+    return _get_distances(lats_from[:, np.newaxis], lons_from[:, np.newaxis],
+                          lats_to, lons_to, accurate)
+
+
+def get_distances(coords_from, coords_to, accurate=False) -> np.ndarray:
+    """Calculate distances between points of n pairs at once, see get_distance_matrix.
+
+    Returns:
+        distances: array of n distances in kilometers
+    """
+    lats_from, lons_from = _to_radians(coords_from)
+    lats_to, lons_to = _to_radians(coords_to)
+    return _get_distances(lats_from, lons_from, lats_to, lons_to, accurate)
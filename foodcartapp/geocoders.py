@@ -0,0 +1,182 @@
+import json
+import logging
+import mmap
+import os
+import time
+from array import array
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+import requests
+
+from .profiling import record_geocoder_call
+from .utils import normalize_address
+
+
+logger = logging.getLogger(__name__)
+
+_geocoders = None
+
+
+class GeocodeResult(NamedTuple):
+    """Result of geocoding, coordinates are known only for found places."""
+    status: str
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+
+    FOUND = 'found'
+    NOT_FOUND = 'not_found'
+    FAILED = 'failed'
+
+
+class Geocoder:
+    """Base class of geocoder backends listed in GEOCODER_BACKENDS setting.
+
+    Remote geocoders are called concurrently and their calls are limited by
+    GeocoderQuota, local ones are called one by one without limits.
+    """
+    remote = False
+
+    def geocode(self, address) -> GeocodeResult:
+        raise NotImplementedError
+
+
+class YandexGeocoder(Geocoder):
+    """Yandex geocoder, docs here: https://yandex.ru/dev/maps/geocoder/
+
+    One session is shared by all calls to keep connections to the geocoder
+    alive. Failed requests are not retried by the session, every request
+    takes its own permit from GeocoderQuota, so the place is geocoded again
+    later with backoff, see get_retry_delay.
+
+    Required settings:
+        GEOCODER_KEY: yandex geocoder api key
+    """
+    remote = True
+
+    def __init__(self):
+        adapter = HTTPAdapter(max_retries=0, pool_maxsize=settings.GEOCODER_MAX_WORKERS)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def geocode(self, address) -> GeocodeResult:
+        """Geocode the address.
+
+        Errors which may pass on retry, like network errors, server errors
+        or exhausted quota, are not raised but returned as FAILED result.
+        """
+        params = {'geocode': address, 'apikey': settings.GEOCODER_KEY, 'format': 'json'}
+        started_at = time.perf_counter()
+        try:
+            response = self.session.get(settings.GEOCODER_URL, params=params,
+                                        timeout=settings.GEOCODER_TIMEOUT)
+            response.raise_for_status()
+            places_found = response.json()['response']['GeoObjectCollection']['featureMember']
+        except (requests.RequestException, ValueError, KeyError) as error:
+            logger.warning('Geocoding of %r failed: %s', address, error)
+            return GeocodeResult(GeocodeResult.FAILED)
+        finally:
+            record_geocoder_call(time.perf_counter() - started_at)
+
+        if not places_found:
+            return GeocodeResult(GeocodeResult.NOT_FOUND)
+        most_relevant = places_found[0]
+        lon, lat = most_relevant['GeoObject']['Point']['pos'].split(' ')
+        return GeocodeResult(GeocodeResult.FOUND, float(lat), float(lon))
+
+
+class GazetteerGeocoder(Geocoder):
+    """Geocoder looking addresses up in a local gazetteer file.
+
+    Gazetteer is a UTF-8 file of `normalized address<TAB>lat<TAB>lon` lines
+    sorted by address bytes, see build_gazetteer command. The file is
+    memory-mapped, so its pages are shared by worker processes. Only offsets
+    of lines and ranges of lines starting with the same bytes are kept in
+    memory, a lookup is a binary search in the range of its prefix.
+
+    Required settings:
+        GEOCODER_GAZETTEER_PATH: path to the gazetteer file
+    """
+    # bytes, that is 8 cyrillic letters, addresses usually start with the city name
+    PREFIX_LENGTH = 16
+
+    def __init__(self):
+        with open(settings.GEOCODER_GAZETTEER_PATH, 'rb') as gazetteer_file:
+            if os.fstat(gazetteer_file.fileno()).st_size:
+                self._data = mmap.mmap(gazetteer_file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._data = b''
+        self._offsets = array('Q')
+        self._prefixes = {}
+        offset = 0
+        while offset < len(self._data):
+            self._offsets.append(offset)
+            line_end = self._data.find(b'\n', offset)
+            offset = len(self._data) if line_end == -1 else line_end + 1
+
+        for line_number in range(len(self._offsets)):
+            prefix = self._get_line_key(line_number)[:self.PREFIX_LENGTH]
+            # lines are sorted, so lines with the same prefix go one after another
+            first_line, _ = self._prefixes.get(prefix, (line_number, None))
+            self._prefixes[prefix] = (first_line, line_number + 1)
+
+    def _get_line(self, line_number):
+        start = self._offsets[line_number]
+        end = self._data.find(b'\n', start)
+        return self._data[start:end if end != -1 else len(self._data)]
+
+    def _get_line_key(self, line_number):
+        line = self._get_line(line_number)
+        return line[:line.find(b'\t')]
+
+    def geocode(self, address) -> GeocodeResult:
+        key = normalize_address(address).encode()
+        low, high = self._prefixes.get(key[:self.PREFIX_LENGTH], (0, 0))
+        while low < high:
+            middle = (low + high) // 2
+            if self._get_line_key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(self._offsets) or self._get_line_key(low) != key:
+            return GeocodeResult(GeocodeResult.NOT_FOUND)
+        line_key, lat, lon = self._get_line(low).split(b'\t')
+        return GeocodeResult(GeocodeResult.FOUND, float(lat), float(lon))
+
+
+class FixtureGeocoder(Geocoder):
+    """Geocoder answering from a JSON file of address: [lat, lon], for tests.
+
+    Required settings:
+        GEOCODER_FIXTURE_PATH: path to the JSON file
+    """
+    def __init__(self):
+        with open(settings.GEOCODER_FIXTURE_PATH, encoding='utf-8') as fixture_file:
+            self._coords = {
+                normalize_address(address): coords
+                for address, coords in json.load(fixture_file).items()
+            }
+
+    def geocode(self, address) -> GeocodeResult:
+        coords = self._coords.get(normalize_address(address))
+        if not coords:
+            return GeocodeResult(GeocodeResult.NOT_FOUND)
+        lat, lon = coords
+        return GeocodeResult(GeocodeResult.FOUND, lat, lon)
+
+
+def get_geocoders() -> list:
+    """Get geocoders of GEOCODER_BACKENDS setting, created once per process."""
+    global _geocoders
+    if _geocoders is None:
+        _geocoders = [import_string(backend)() for backend in settings.GEOCODER_BACKENDS]
+    return _geocoders
+
+
+def reset_geocoders():
+    """Create geocoders again on the next call, e.g. when settings are changed in tests."""
+    global _geocoders
+    _geocoders = None
@@ -0,0 +1,40 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from foodcartapp.models import Order, Place, Restaurant
+from foodcartapp.utils import normalize_address
+
+
+class Command(BaseCommand):
+    help = 'Report geocoder calls saved by address normalization and share of geocoded addresses'
+
+    def handle(self, *args, **options):
+        addresses = set(Order.objects.values_list('address', flat=True)) | \
+            set(Restaurant.objects.values_list('address', flat=True))
+        addresses.discard('')
+        normalized_addresses = {normalize_address(address) for address in addresses}
+        places_statuses = {
+            normalized_address: status
+            for normalized_address, status in Place.objects.values_list('normalized_address', 'status')
+            if normalized_address in normalized_addresses
+        }
+        statuses_counts = Counter(places_statuses.values())
+
+        saved_count = len(addresses) - len(normalized_addresses)
+        found_count = statuses_counts[Place.FOUND]
+        self.stdout.write(f'distinct addresses:            {len(addresses)}')
+        self.stdout.write(f'distinct normalized addresses: {len(normalized_addresses)}')
+        self.stdout.write(
+            f'geocoder calls saved:          {saved_count} '
+            f'({saved_count / max(len(addresses), 1):.1%} of addresses are duplicates)'
+        )
+        self.stdout.write(
+            f'found coordinates:             {found_count} '
+            f'({found_count / max(len(normalized_addresses), 1):.1%} hit rate)'
+        )
+        self.stdout.write(f'not found:                     {statuses_counts[Place.NOT_FOUND]}')
+        self.stdout.write(f'waiting for geocoder:          {statuses_counts[Place.PENDING]}')
+        self.stdout.write(
+            f'not queued:                    {len(normalized_addresses) - len(places_statuses)}'
+        )
@@ -0,0 +1,48 @@
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from foodcartapp.distances import get_distance_matrix
+from foodcartapp.utils import get_distance
+
+
+def get_random_coords(count, center=(55.75, 37.62), spread=0.3):
+    return [
+        (center[0] + random.uniform(-spread, spread), center[1] + random.uniform(-spread, spread))
+        for _ in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Compare per-pair geodesic distances with vectorized distance matrix'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=500)
+        parser.add_argument('--restaurants', type=int, default=50)
+
+    def handle(self, *args, **options):
+        orders_coords = get_random_coords(options['orders'])
+        restaurants_coords = get_random_coords(options['restaurants'])
+
+        started_at = time.perf_counter()
+        geodesic_distances = np.array([
+            [get_distance(order_coords, restaurant_coords)
+             for restaurant_coords in restaurants_coords]
+            for order_coords in orders_coords
+        ])
+        self.report('geopy per pair', time.perf_counter() - started_at)
+
+        for accurate in (False, True):
+            started_at = time.perf_counter()
+            distances = get_distance_matrix(orders_coords, restaurants_coords, accurate=accurate)
+            elapsed = time.perf_counter() - started_at
+            max_error = np.abs(distances - geodesic_distances).max()
+            self.report('numpy accurate' if accurate else 'numpy haversine', elapsed, max_error)
+
+    def report(self, name, elapsed, max_error=None):
+        line = f'{name:<16} {elapsed * 1000:10.2f} ms'
+        if max_error is not None:
+            line += f'   max error {max_error * 1000:.1f} m'
+        self.stdout.write(line)
@@ -0,0 +1,42 @@
+import csv
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from foodcartapp.models import Place
+from foodcartapp.utils import normalize_address
+
+
+class Command(BaseCommand):
+    help = 'Build gazetteer file of GazetteerGeocoder from CSV files and geocoded places'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--csv', nargs='*', default=[],
+                            help='CSV files of address,lat,lon rows without header')
+        parser.add_argument('--from-places', action='store_true',
+                            help='add places already found by geocoders')
+        parser.add_argument('--output', default=settings.GEOCODER_GAZETTEER_PATH)
+
+    def handle(self, *args, **options):
+        if not options['csv'] and not options['from_places']:
+            raise CommandError('Pass CSV files or --from-places')
+
+        addresses_coords = {}
+        for csv_path in options['csv']:
+            with open(csv_path, encoding='utf-8', newline='') as csv_file:
+                for address, lat, lon in csv.reader(csv_file):
+                    addresses_coords[normalize_address(address)] = (float(lat), float(lon))
+        if options['from_places']:
+            found_places = Place.objects.filter(status=Place.FOUND) \
+                .values_list('address', 'lat', 'lon')
+            for address, lat, lon in found_places.iterator():
+                addresses_coords[normalize_address(address)] = (lat, lon)
+
+        # GazetteerGeocoder searches lines by address bytes
+        lines = sorted(
+            (f'{address}\t{lat}\t{lon}\n'.encode()
+             for address, (lat, lon) in addresses_coords.items() if address),
+        )
+        with open(options['output'], 'wb') as gazetteer_file:
+            gazetteer_file.writelines(lines)
+        self.stdout.write(f'Written {len(lines)} addresses to {options["output"]}')
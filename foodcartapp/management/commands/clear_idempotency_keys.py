@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from foodcartapp.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = 'Delete expired idempotency keys of order registration'
+
+    def handle(self, *args, **options):
+        deleted_count, _ = IdempotencyKey.objects.expired().delete()
+        self.stdout.write(f'Deleted {deleted_count} expired keys')
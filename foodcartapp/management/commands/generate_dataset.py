@@ -0,0 +1,97 @@
+import random
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from foodcartapp.catalogue import reset_product_catalogue
+from foodcartapp.models import (Order, OrderProduct, OrderRestaurant, Place, Product,
+                                ProductCategory, Restaurant, RestaurantMenuItem)
+from foodcartapp.utils import normalize_address
+
+
+STREETS = ['Тверская улица', 'Арбат', 'Ленинский проспект', 'Профсоюзная улица',
+           'Новый Арбат', 'улица Покровка', 'Мясницкая улица', 'Кутузовский проспект']
+
+
+def get_random_address(number):
+    return f'Москва, {random.choice(STREETS)}, {number}'
+
+
+def get_random_place(address):
+    return Place(address=address, normalized_address=normalize_address(address),
+                 lat=random.uniform(55.55, 55.95), lon=random.uniform(37.35, 37.85),
+                 status=Place.FOUND)
+
+
+@transaction.atomic
+def generate_dataset(restaurants_count, products_count, orders_count, lines_count=3,
+                     availability_share=0.9):
+    """Fill the database with random restaurants, products and orders.
+
+    Signals are not sent for bulk inserts, so the catalogue is reset at
+    the end. Every generated address gets a geocoded place before orders
+    are saved and restaurants of the orders are found right away, so the
+    orders page never waits for the geocoder or the worker.
+    """
+    category = ProductCategory.objects.create(name='Сгенерированные')
+    products = Product.objects.bulk_create([
+        Product(name=f'Бургер {number}', category=category, image='generated.jpg',
+                price=Decimal(random.randrange(100, 1000)))
+        for number in range(products_count)
+    ])
+    if not all(product.id for product in products):
+        products = list(Product.objects.filter(category=category))
+
+    restaurants = []
+    for number in range(restaurants_count):
+        restaurant = Restaurant(name=f'Star Burger {number}', address=get_random_address(number))
+        restaurant.save()
+        restaurants.append(restaurant)
+    RestaurantMenuItem.objects.bulk_create([
+        RestaurantMenuItem(restaurant=restaurant, product=product,
+                           availability=random.random() < availability_share)
+        for restaurant in restaurants for product in products
+    ])
+
+    orders_with_products = []
+    for number in range(orders_count):
+        order = Order(firstname='Иван', lastname=f'Покупатель {number}',
+                      phonenumber='+79000000000', address=get_random_address(number),
+                      status=random.choice([Order.UNPROCESSED, Order.DELIVERY, Order.DELIVERED]))
+        order_products = []
+        for product in random.sample(products, min(lines_count, len(products))):
+            quantity = random.randint(1, 3)
+            order_products.append(OrderProduct(product=product, quantity=quantity,
+                                               total_price=product.price * quantity))
+        order.total_price = sum(order_product.total_price for order_product in order_products)
+        orders_with_products.append((order, order_products))
+
+    addresses = {restaurant.address for restaurant in restaurants} | \
+        {order.address for order, order_products in orders_with_products}
+    Place.objects.bulk_upsert([get_random_place(address) for address in addresses])
+    Order.objects.bulk_create_with_products(orders_with_products)
+    OrderRestaurant.objects.refresh(
+        order_ids=[order.id for order, order_products in orders_with_products]
+    )
+    reset_product_catalogue()
+
+
+class Command(BaseCommand):
+    help = 'Generate random restaurants, products and orders with geocoded addresses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurants', type=int, default=20)
+        parser.add_argument('--products', type=int, default=200)
+        parser.add_argument('--orders', type=int, default=5000)
+        parser.add_argument('--lines', type=int, default=3, help='order lines in every order')
+        parser.add_argument('--seed', type=int, help='seed of random generator')
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        generate_dataset(options['restaurants'], options['products'], options['orders'],
+                         options['lines'])
+        self.stdout.write(
+            f'Generated {options["restaurants"]} restaurants, {options["products"]} products '
+            f'and {options["orders"]} orders'
+        )
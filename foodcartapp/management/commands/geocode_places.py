@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from foodcartapp.models import OrderRestaurant, Place
+
+
+class Command(BaseCommand):
+    help = 'Geocode places waiting in the queue and find restaurants of new orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='places geocoded in parallel at once')
+        parser.add_argument('--interval', type=float, default=5,
+                            help='seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='exit when the queue is empty')
+
+    def handle(self, *args, **options):
+        while True:
+            refreshed_count = OrderRestaurant.objects.refresh_new_orders()
+            if refreshed_count:
+                self.stdout.write(f'Found restaurants of {refreshed_count} new orders')
+            geocoded_count = Place.objects.geocode_pending(options['batch_size'])
+            if geocoded_count:
+                self.stdout.write(f'Geocoded {geocoded_count} places')
+            if refreshed_count or geocoded_count:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,56 @@
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from foodcartapp.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Register orders through the API from concurrent clients and report throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/api/order/')
+        parser.add_argument('--clients', type=int, default=10)
+        parser.add_argument('--orders', type=int, default=200)
+        parser.add_argument('--lines', type=int, default=3, help='order lines in every order')
+
+    def handle(self, *args, **options):
+        product_ids = list(Product.objects.available().values_list('id', flat=True))
+        if not product_ids:
+            raise CommandError('No available products to order')
+
+        sessions = threading.local()
+
+        def register_order(order_number):
+            if not hasattr(sessions, 'session'):
+                sessions.session = requests.Session()
+            order = {
+                'firstname': 'Load',
+                'lastname': f'Test {order_number}',
+                'phonenumber': '+79000000000',
+                'address': f'Москва, Тверская улица, {order_number % 100 + 1}',
+                'products': [
+                    {'product': random.choice(product_ids), 'quantity': random.randint(1, 3)}
+                    for _ in range(options['lines'])
+                ],
+            }
+            started_at = time.perf_counter()
+            response = sessions.session.post(options['url'], json=order)
+            return response.status_code, time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['clients']) as executor:
+            results = list(executor.map(register_order, range(options['orders'])))
+        elapsed = time.perf_counter() - started_at
+
+        latencies = sorted(latency for status_code, latency in results)
+        errors_count = sum(status_code != 201 for status_code, latency in results)
+        self.stdout.write(f'orders:      {len(results)}, errors: {errors_count}')
+        self.stdout.write(f'throughput:  {len(results) / elapsed:.1f} orders/s')
+        self.stdout.write(f'latency p50: {statistics.median(latencies) * 1000:.1f} ms')
+        self.stdout.write(f'latency p95: {latencies[int((len(latencies) - 1) * 0.95)] * 1000:.1f} ms')
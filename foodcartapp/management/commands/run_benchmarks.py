@@ -0,0 +1,142 @@
+import json
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from foodcartapp.catalogue import reset_product_catalogue
+from foodcartapp.models import Order, Product
+from foodcartapp.views import product_list_api, register_order
+from restaurateur.views import view_orders, view_products
+
+from .generate_dataset import generate_dataset
+
+
+SIZES = {
+    'small': {'restaurants_count': 5, 'products_count': 50, 'orders_count': 500},
+    'medium': {'restaurants_count': 20, 'products_count': 200, 'orders_count': 5000},
+    'large': {'restaurants_count': 50, 'products_count': 1000, 'orders_count': 20000},
+}
+
+
+def measure(func, repeat, setup=None):
+    """Call func repeat times and collect its timings in milliseconds.
+
+    Queries are counted on the last call, setup is called before every
+    call and is not timed.
+    """
+    durations = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with CaptureQueriesContext(connection) as queries:
+            started_at = time.perf_counter()
+            func()
+            durations.append((time.perf_counter() - started_at) * 1000)
+    return {
+        'min_ms': round(min(durations), 2),
+        'median_ms': round(statistics.median(durations), 2),
+        'max_ms': round(max(durations), 2),
+        'queries': len(queries),
+    }
+
+
+def clear_caches():
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+def run_benchmarks(repeat):
+    factory = RequestFactory()
+    manager = User(username='benchmark', is_staff=True)
+    product_ids = list(Product.objects.available().values_list('id', flat=True))
+
+    def get(view, path):
+        request = factory.get(path)
+        request.user = manager
+        response = view(request)
+        assert response.status_code == 200, response.status_code
+        if hasattr(response, 'render'):
+            response.render()
+
+    def post_order():
+        order = {
+            'firstname': 'Benchmark',
+            'lastname': 'Test',
+            'phonenumber': '+79000000000',
+            'address': 'Москва, Тверская улица, 1',
+            'products': [
+                {'product': product_id, 'quantity': 1}
+                for product_id in random.sample(product_ids, min(3, len(product_ids)))
+            ],
+        }
+        request = factory.post('/api/order/', json.dumps(order), content_type='application/json')
+        response = register_order(request)
+        assert response.status_code == 201, response.status_code
+
+    return {
+        'orders_page_queryset': measure(
+            lambda: Order.objects.with_status(Order.UNPROCESSED).get_page_with_restaurants(),
+            repeat,
+        ),
+        'view_orders': measure(lambda: get(view_orders, '/manager/orders/'), repeat),
+        'product_list_api_cold': measure(
+            lambda: get(product_list_api, '/api/products/'), repeat, setup=reset_product_catalogue,
+        ),
+        'product_list_api_warm': measure(lambda: get(product_list_api, '/api/products/'), repeat),
+        'view_products_cold': measure(
+            lambda: get(view_products, '/manager/products/'), repeat, setup=reset_product_catalogue,
+        ),
+        'view_products_warm': measure(lambda: get(view_products, '/manager/products/'), repeat),
+        'register_order': measure(post_order, repeat),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate datasets of given sizes and time orders page, products catalogue, '
+        'products page and order registration on them. Generated data is rolled back, '
+        'but cache is cleared, so run it against a scratch database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', default=['small', 'medium'],
+                            help=f'dataset sizes: {", ".join(SIZES)}')
+        parser.add_argument('--repeat', type=int, default=5, help='calls of every benchmark')
+        parser.add_argument('--seed', type=int, default=0, help='seed of random generator')
+        parser.add_argument('--output', help='JSON file to write results to, stdout by default')
+
+    def handle(self, *args, **options):
+        unknown_sizes = set(options['sizes']) - SIZES.keys()
+        if unknown_sizes:
+            raise CommandError(f'Unknown sizes: {", ".join(sorted(unknown_sizes))}')
+
+        results = {'database': connection.vendor, 'repeat': options['repeat'], 'sizes': {}}
+        for size in options['sizes']:
+            random.seed(options['seed'])
+            clear_caches()
+            with transaction.atomic():
+                started_at = time.perf_counter()
+                generate_dataset(**SIZES[size])
+                generation_duration = time.perf_counter() - started_at
+                results['sizes'][size] = {
+                    'dataset': SIZES[size],
+                    'generation_s': round(generation_duration, 2),
+                    'benchmarks': run_benchmarks(options['repeat']),
+                }
+                transaction.set_rollback(True)
+            clear_caches()
+
+        report = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report)
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,30 @@
+# Generated by Django 3.0.7 on 2026-10-18 03:27
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0041_order_payment_method'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Place',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address', models.TextField(verbose_name='адрес')),
+                ('normalized_address', models.TextField(unique=True, verbose_name='нормализованный адрес')),
+                ('lat', models.FloatField(blank=True, null=True, verbose_name='широта')),
+                ('lon', models.FloatField(blank=True, null=True, verbose_name='долгота')),
+                ('fetched_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='получено в')),
+                ('status', models.CharField(choices=[('FND', 'Найдено'), ('NFD', 'Не найдено')], default='FND', max_length=3, verbose_name='статус')),
+            ],
+            options={
+                'verbose_name': 'место',
+                'verbose_name_plural': 'места',
+            },
+        ),
+    ]
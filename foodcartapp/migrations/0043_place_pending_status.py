@@ -0,0 +1,18 @@
+# Generated by Django 3.0.7 on 2026-10-18 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0042_place'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='place',
+            name='status',
+            field=models.CharField(choices=[('PND', 'Ожидает геокодирования'), ('FND', 'Найдено'), ('NFD', 'Не найдено')], db_index=True, default='PND', max_length=3, verbose_name='статус'),
+        ),
+    ]
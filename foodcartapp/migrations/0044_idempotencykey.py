@@ -0,0 +1,28 @@
+# Generated by Django 3.0.7 on 2026-10-18 03:38
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0043_place_pending_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True, verbose_name='ключ')),
+                ('response_status', models.PositiveSmallIntegerField(verbose_name='статус ответа')),
+                ('response_body', models.TextField(verbose_name='тело ответа')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='создан в')),
+            ],
+            options={
+                'verbose_name': 'ключ идемпотентности',
+                'verbose_name_plural': 'ключи идемпотентности',
+            },
+        ),
+    ]
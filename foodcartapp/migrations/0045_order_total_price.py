@@ -0,0 +1,33 @@
+# Generated by Django 3.0.7 on 2026-10-18 03:38
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_orders_total_price(apps, schema_editor):
+    Order = apps.get_model('foodcartapp', 'Order')
+    OrderProduct = apps.get_model('foodcartapp', 'OrderProduct')
+    orders_totals = OrderProduct.objects.filter(order=OuterRef('pk')) \
+        .values('order') \
+        .annotate(total=Sum('total_price')) \
+        .values('total')
+    Order.objects.update(total_price=Coalesce(
+        Subquery(orders_totals, output_field=models.DecimalField()), Value(0)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0044_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='total_price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='стоимость'),
+        ),
+        migrations.RunPython(fill_orders_total_price, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.0.7 on 2026-10-18 03:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0045_order_total_price'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'id'], name='order_status_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['registered_at'], name='order_registered_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderproduct',
+            index=models.Index(fields=['order', 'product'], name='orderproduct_order_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurantmenuitem',
+            index=models.Index(fields=['product', 'availability'], name='menuitem_product_avail_idx'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+import re
+from collections import defaultdict
+
+from django.db import migrations
+
+
+# Copy of foodcartapp.utils.normalize_address as of this migration, later
+# changes of the normalization must not change what this migration does
+ADDRESS_ABBREVIATIONS = {
+    'г': 'город',
+    'ул': 'улица',
+    'пр-т': 'проспект',
+    'просп': 'проспект',
+    'пер': 'переулок',
+    'пл': 'площадь',
+    'ш': 'шоссе',
+    'б-р': 'бульвар',
+    'бул': 'бульвар',
+    'наб': 'набережная',
+    'мкр': 'микрорайон',
+    'д': 'дом',
+    'корп': 'корпус',
+    'к': 'корпус',
+    'стр': 'строение',
+}
+ADDRESS_IMPLIED_WORDS = {'город', 'улица', 'дом'}
+ADDRESS_PUNCTUATION = re.compile(r'[^\w\s/-]')
+
+
+def normalize_address(address):
+    address = address.casefold().replace('ё', 'е')
+    words = ADDRESS_PUNCTUATION.sub(' ', address).split()
+    words = [ADDRESS_ABBREVIATIONS.get(word, word) for word in words]
+    return ' '.join(word for word in words if word not in ADDRESS_IMPLIED_WORDS)
+
+
+def renormalize_places(apps, schema_editor):
+    Place = apps.get_model('foodcartapp', 'Place')
+    places_by_address = defaultdict(list)
+    for place in Place.objects.order_by('-fetched_at'):
+        places_by_address[normalize_address(place.address)].append(place)
+
+    duplicate_ids = []
+    places_to_update = []
+    for normalized_address, places in places_by_address.items():
+        # found places win, the most recently fetched one among them
+        places.sort(key=lambda place: place.status != 'FND')
+        place, *duplicates = places
+        duplicate_ids.extend(duplicate.id for duplicate in duplicates)
+        if place.normalized_address != normalized_address:
+            place.normalized_address = normalized_address
+            places_to_update.append(place)
+
+    for start in range(0, len(duplicate_ids), 500):
+        Place.objects.filter(id__in=duplicate_ids[start:start + 500]).delete()
+    # a new address may still be the old address of another place, so every
+    # place gets a temporary unique address first, "#" never survives normalization
+    new_addresses = {place.id: place.normalized_address for place in places_to_update}
+    for place in places_to_update:
+        place.normalized_address = f'#{place.id}'
+    Place.objects.bulk_update(places_to_update, ['normalized_address'], batch_size=500)
+    for place in places_to_update:
+        place.normalized_address = new_addresses[place.id]
+    Place.objects.bulk_update(places_to_update, ['normalized_address'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0046_dashboard_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(renormalize_places, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.0.7 on 2026-10-18 03:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0047_renormalize_places'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='неудачных попыток подряд'),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='retry_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='повторить после'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.0.7 on 2026-10-18 03:49
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0048_place_retry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocoderQuota',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True, verbose_name='день')),
+                ('calls', models.PositiveIntegerField(default=0, verbose_name='запросов к геокодеру')),
+                ('tokens', models.FloatField(default=0, verbose_name='доступно запросов сейчас')),
+                ('tokens_updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='обновлено в')),
+            ],
+            options={
+                'verbose_name': 'квота геокодера',
+                'verbose_name_plural': 'квоты геокодера',
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.0.7 on 2026-10-18 04:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0049_geocoderquota'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderRestaurant',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('distance', models.FloatField(blank=True, null=True, verbose_name='расстояние, км')),
+                ('can_fulfil', models.BooleanField(default=False, verbose_name='может приготовить заказ')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_restaurants', to='foodcartapp.Order', verbose_name='заказ')),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_restaurants', to='foodcartapp.Restaurant', verbose_name='ресторан')),
+            ],
+            options={
+                'verbose_name': 'ресторан заказа',
+                'verbose_name_plural': 'рестораны заказов',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='orderrestaurant',
+            index=models.Index(fields=['restaurant', 'distance'], name='orderrest_rest_distance_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='orderrestaurant',
+            unique_together={('order', 'restaurant')},
+        ),
+    ]
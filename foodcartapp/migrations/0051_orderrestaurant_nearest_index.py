@@ -0,0 +1,17 @@
+# Generated by Django 3.0.7 on 2026-10-18 04:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0050_orderrestaurant'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orderrestaurant',
+            index=models.Index(fields=['order', 'can_fulfil', 'distance'], name='orderrest_order_nearest_idx'),
+        ),
+    ]
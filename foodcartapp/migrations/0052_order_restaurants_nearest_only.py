@@ -0,0 +1,42 @@
+# Generated by Django 3.0.7 on 2026-10-18 04:38
+
+from django.db import migrations, models
+
+
+def delete_order_restaurants(apps, schema_editor):
+    # rows of every restaurant are replaced with the nearest ones only,
+    # orders are recalculated by geocode_places command or the orders page
+    OrderRestaurant = apps.get_model('foodcartapp', 'OrderRestaurant')
+    OrderRestaurant.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0051_orderrestaurant_nearest_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_order_restaurants, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='orderrestaurant',
+            name='orderrest_rest_distance_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='orderrestaurant',
+            name='orderrest_order_nearest_idx',
+        ),
+        migrations.RemoveField(
+            model_name='orderrestaurant',
+            name='can_fulfil',
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='restaurants_refreshed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='рестораны подобраны в'),
+        ),
+        migrations.AddIndex(
+            model_name='orderrestaurant',
+            index=models.Index(fields=['distance'], name='orderrest_distance_idx'),
+        ),
+    ]
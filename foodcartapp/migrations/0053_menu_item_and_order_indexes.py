@@ -0,0 +1,22 @@
+# Generated by Django 3.0.7 on 2026-10-18 04:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0052_order_restaurants_nearest_only'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='order',
+            name='order_registered_at_idx',
+        ),
+        migrations.AlterField(
+            model_name='restaurantmenuitem',
+            name='availability',
+            field=models.BooleanField(default=True, verbose_name='в продаже'),
+        ),
+    ]
@@ -1,9 +1,268 @@
+import hashlib
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.cache import caches
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import Count, F, Max, Q, Sum
 from django.utils import timezone
 from django.conf import settings
 
-from .utils import get_restaurant_distance
+from .availability import fetch_menus_masks, find_capable_restaurants
+from .distances import HAVERSINE_MAX_ERROR, get_distances
+from .geocoders import GeocodeResult, get_geocoders
+from .spatial import get_restaurants_index
+from .utils import fetch_many_coordinates, get_retry_delay, normalize_address
+
+
+ORDERS_PER_PAGE = 50
+# orders recalculated at once, see OrderRestaurantQuerySet.refresh
+ORDER_RESTAURANTS_CHUNK_SIZE = 500
+
+PLACE_COORDS_KEY = 'place_coords:{}'
+
+
+def get_place_coords_key(normalized_address):
+    return PLACE_COORDS_KEY.format(hashlib.md5(normalized_address.encode()).hexdigest())
+
+
+class PlaceQuerySet(models.QuerySet):
+    def get_coordinates(self, addresses) -> dict:
+        """Get coordinates of already geocoded addresses.
+
+        Coordinates of found places are cached, the rest of places are loaded
+        with one query by normalized address. Addresses never seen before are
+        put in the geocoding queue, so the caller never waits for the geocoder.
+
+        Returns:
+            addresses_coords: dict of address: (lat, lon), only for addresses
+                with found coordinates
+        """
+        normalized_addresses = {address: normalize_address(address) for address in addresses}
+        keys = {
+            get_place_coords_key(normalized_address): normalized_address
+            for normalized_address in set(normalized_addresses.values())
+        }
+        cached_coords = caches['places'].get_many(keys)
+        places_coords = {keys[key]: coords for key, coords in cached_coords.items()}
+
+        missing_addresses = set(keys.values()) - places_coords.keys()
+        if missing_addresses:
+            places = self.in_bulk(missing_addresses, field_name='normalized_address')
+            self.enqueue(
+                address for address, normalized_address in normalized_addresses.items()
+                if normalized_address in missing_addresses and normalized_address not in places
+            )
+            found_coords = {
+                normalized_address: place.coords for normalized_address, place in places.items()
+                if place.status == Place.FOUND
+            }
+            caches['places'].set_many({
+                get_place_coords_key(normalized_address): coords
+                for normalized_address, coords in found_coords.items()
+            })
+            places_coords.update(found_coords)
+
+        return {
+            address: places_coords[normalized_address]
+            for address, normalized_address in normalized_addresses.items()
+            if normalized_address in places_coords
+        }
+
+    def enqueue(self, addresses):
+        """Put unknown addresses in the geocoding queue.
+
+        Queue is processed by `geocode_places` management command.
+        """
+        new_places = {
+            normalize_address(address): Place(address=address,
+                                              normalized_address=normalize_address(address),
+                                              status=Place.PENDING)
+            for address in addresses if address
+        }
+        self.bulk_create(new_places.values(), ignore_conflicts=True)
+
+    def geocode_pending(self, batch_size) -> int:
+        """Geocode a batch of queued places with geocoders of GEOCODER_BACKENDS.
+
+        Places not found are geocoded again after GEOCODER_NOT_FOUND_TTL
+        seconds. Places failed to geocode stay in the queue and are retried
+        with exponential backoff, see get_retry_delay. Places over the
+        geocoder limits are left in the queue, see GeocoderQuota.
+
+        Returns:
+            geocoded_count: number of places taken from the queue
+        """
+        now = timezone.now()
+        ready_to_retry = Q(retry_at__isnull=True) | Q(retry_at__lte=now)
+        pending_places = list(
+            self.filter(Q(status=Place.PENDING) & ready_to_retry |
+                        Q(status=Place.NOT_FOUND, retry_at__lte=now))
+            .order_by('id')[:batch_size]
+        )
+        fetched_results = self._fetch_results([place.address for place in pending_places])
+        pending_places = [place for place in pending_places if place.address in fetched_results]
+        for place in pending_places:
+            result = fetched_results[place.address]
+            if result.status == GeocodeResult.FAILED:
+                place.attempts += 1
+                place.retry_at = now + timedelta(seconds=get_retry_delay(place.attempts))
+                continue
+            place.lat, place.lon = result.lat, result.lon
+            place.fetched_at = now
+            place.attempts = 0
+            if result.status == GeocodeResult.FOUND:
+                place.status = Place.FOUND
+                place.retry_at = None
+            else:
+                place.status = Place.NOT_FOUND
+                place.retry_at = now + timedelta(seconds=settings.GEOCODER_NOT_FOUND_TTL)
+        self.bulk_upsert(pending_places)
+        return len(pending_places)
+
+    @staticmethod
+    def _fetch_results(addresses) -> dict:
+        """Ask geocoders one by one until the address is found.
+
+        Returns:
+            addresses_results: dict of address: GeocodeResult, addresses left
+                unchecked by remote geocoders because of GeocoderQuota are
+                skipped unless found by another geocoder
+        """
+        found_results = {}
+        other_results = {}
+        unchecked_addresses = set()
+        for geocoder in get_geocoders():
+            geocoder_addresses = addresses
+            if geocoder.remote:
+                permits_count = GeocoderQuota.objects.acquire(len(addresses))
+                geocoder_addresses = addresses[:permits_count]
+                unchecked_addresses.update(addresses[permits_count:])
+            for address, result in fetch_many_coordinates(geocoder, geocoder_addresses).items():
+                if result.status == GeocodeResult.FOUND:
+                    found_results[address] = result
+                elif address not in other_results or result.status == GeocodeResult.FAILED:
+                    # a failure wins over not found, so the address is retried later
+                    other_results[address] = result
+            addresses = [address for address in addresses if address not in found_results]
+        found_results.update({
+            address: other_results[address] for address in addresses
+            if address not in unchecked_addresses
+        })
+        return found_results
+
+    def bulk_upsert(self, places):
+        """Save places, updating the ones with already known normalized address."""
+        existing_places = self.in_bulk(
+            [place.normalized_address for place in places], field_name='normalized_address'
+        )
+        places_to_update = []
+        places_to_create = []
+        for place in places:
+            if place.normalized_address in existing_places:
+                place.id = existing_places[place.normalized_address].id
+                places_to_update.append(place)
+            else:
+                places_to_create.append(place)
+
+        self.bulk_update(places_to_update,
+                         ['address', 'lat', 'lon', 'fetched_at', 'status', 'attempts', 'retry_at'])
+        self.bulk_create(places_to_create, ignore_conflicts=True)
+        caches['places'].delete_many(
+            [get_place_coords_key(place.normalized_address) for place in places]
+        )
+        OrderRestaurant.objects.refresh_places(
+            place.normalized_address for place in places if place.status == Place.FOUND
+        )
+
+
+class Place(models.Model):
+    PENDING = 'PND'
+    FOUND = 'FND'
+    NOT_FOUND = 'NFD'
+    STATUS_CHOICES = [
+        (PENDING, 'Ожидает геокодирования'),
+        (FOUND, 'Найдено'),
+        (NOT_FOUND, 'Не найдено'),
+    ]
+    address = models.TextField('адрес')
+    normalized_address = models.TextField('нормализованный адрес', unique=True)
+    lat = models.FloatField('широта', null=True, blank=True)
+    lon = models.FloatField('долгота', null=True, blank=True)
+    fetched_at = models.DateTimeField('получено в', default=timezone.now)
+    status = models.CharField('статус', max_length=3, choices=STATUS_CHOICES, default=PENDING,
+                              db_index=True)
+    attempts = models.PositiveSmallIntegerField('неудачных попыток подряд', default=0)
+    retry_at = models.DateTimeField('повторить после', null=True, blank=True, db_index=True)
+
+    objects = PlaceQuerySet.as_manager()
+
+    def __str__(self):
+        return self.address
+
+    @property
+    def coords(self):
+        return self.lat, self.lon
+
+    class Meta:
+        verbose_name = 'место'
+        verbose_name_plural = 'места'
+
+
+class GeocoderQuotaQuerySet(models.QuerySet):
+    def acquire(self, calls_count) -> int:
+        """Take permits for geocoder calls from the shared limits.
+
+        Calls are limited by a token bucket refilled at GEOCODER_RATE_LIMIT
+        calls per second up to GEOCODER_BURST calls, and by GEOCODER_DAILY_QUOTA
+        calls per day. State of the limits is kept in the database, so the
+        limits are shared by all worker processes.
+
+        Returns:
+            allowed_count: number of calls allowed right now, from 0 up to
+                calls_count
+        """
+        if not calls_count:
+            return 0
+        now = timezone.now()
+        with transaction.atomic(using=self.db):
+            quota, created = self.select_for_update().get_or_create(
+                day=now.date(),
+                defaults={'tokens': settings.GEOCODER_BURST, 'tokens_updated_at': now},
+            )
+            elapsed = max((now - quota.tokens_updated_at).total_seconds(), 0)
+            tokens = min(quota.tokens + elapsed * settings.GEOCODER_RATE_LIMIT,
+                         settings.GEOCODER_BURST)
+            allowed_count = max(min(calls_count, int(tokens), quota.get_remaining_calls()), 0)
+            quota.tokens = tokens - allowed_count
+            quota.tokens_updated_at = now
+            quota.calls += allowed_count
+            quota.save(update_fields=['tokens', 'tokens_updated_at', 'calls'])
+        return allowed_count
+
+    def get_today(self):
+        today = timezone.now().date()
+        return self.filter(day=today).first() or GeocoderQuota(day=today)
+
+
+class GeocoderQuota(models.Model):
+    day = models.DateField('день', unique=True)
+    calls = models.PositiveIntegerField('запросов к геокодеру', default=0)
+    tokens = models.FloatField('доступно запросов сейчас', default=0)
+    tokens_updated_at = models.DateTimeField('обновлено в', default=timezone.now)
+
+    objects = GeocoderQuotaQuerySet.as_manager()
+
+    def __str__(self):
+        return f'{self.day}: {self.calls}'
+
+    def get_remaining_calls(self):
+        return max(settings.GEOCODER_DAILY_QUOTA - self.calls, 0)
+
+    class Meta:
+        verbose_name = 'квота геокодера'
+        verbose_name_plural = 'квоты геокодера'
 
 
 class Restaurant(models.Model):
@@ -57,7 +316,7 @@ class Product(models.Model):
 class RestaurantMenuItem(models.Model):
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='menu_items')
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='menu_items')
-    availability = models.BooleanField('в продаже', default=True, db_index=True)
+    availability = models.BooleanField('в продаже', default=True)
 
     def __str__(self):
         return f"{self.restaurant.name} - {self.product.name}"
@@ -68,55 +327,140 @@ class RestaurantMenuItem(models.Model):
         unique_together = [
             ['restaurant', 'product']
         ]
+        indexes = [
+            # products catalogue joins menu items of available products
+            models.Index(fields=['product', 'availability'], name='menuitem_product_avail_idx'),
+        ]
 
 
 class OrderQuerySet(models.QuerySet):
-    def all_with_restaurants(self) -> list:
-        """Get all orders with restaurant names and distances to them.
+    def unprocessed(self):
+        return self.filter(status=Order.UNPROCESSED)
 
-        This query use RestaurantMenuItem model as entry point to reduce
-        the number of queries.
+    def get_capable_restaurant_ids(self, menus_masks) -> dict:
+        """Find restaurants able to cook every product of the orders.
 
-        Required settings:
-            GEOCODER_KEY: yandex geocoder api key, docs here:
-                https://yandex.ru/dev/maps/geocoder/
+        Order lines are loaded with one query and checked against menus
+        of restaurants, see foodcartapp.availability.
+
+        Args:
+            menus_masks: menus of restaurants to check, see fetch_menus_masks
 
         Returns:
-            sorted_orders: collected and sorted by id orders with restaurants data
+            capable_restaurants: dict of order_id: list of restaurant ids
         """
-        rest_menu_items = RestaurantMenuItem.objects.select_related('restaurant', 'product') \
-            .prefetch_related('product__orderproduct_set__order')
-
-        apikey = settings.GEOCODER_KEY
-        orders = set()
-        handled_order_products = set()
-        for menu_item in rest_menu_items:
-            if not menu_item.availability:
-                continue
-            for order_product in menu_item.product.orderproduct_set.all():
-                try:
-                    order_product.order.restaurants
-                except AttributeError:
-                    order_product.order.restaurants = dict()
-                    order_product.order.total_price = 0
+        orders_products = defaultdict(set)
+        for order_id, product_id in OrderProduct.objects.filter(order__in=self) \
+                .values_list('order', 'product'):
+            orders_products[order_id].add(product_id)
+        return find_capable_restaurants(orders_products, menus_masks)
+
+    def fetch_with_restaurants(self) -> list:
+        """Fetch orders with restaurants and distances to them.
+
+        Restaurants and distances are read from OrderRestaurant rows, which
+        are kept up to date when orders, restaurants, menus or coordinates
+        change. Rows of orders never calculated are calculated on the fly.
+
+        Restaurants are looked for unprocessed orders only, the rest of orders
+        get an empty list. Only restaurants able to cook the whole order are
+        taken into account, NEAREST_RESTAURANTS_COUNT nearest of them within
+        MAX_DELIVERY_DISTANCE are listed. Restaurants with distance unknown
+        while any of the addresses waits for geocoding are listed with None
+        distance.
 
-                orders.add(order_product.order)
-
-                if menu_item.restaurant.name not in order_product.order.restaurants.keys():
-                    order_product.order.restaurants[menu_item.restaurant.name] = \
-                        get_restaurant_distance(
-                            apikey, order_product.order.address,
-                            menu_item.restaurant.address)
-
-                if order_product not in handled_order_products:
-                    order_product.order.total_price += order_product.total_price
-                    handled_order_products.add(order_product)
+        Returns:
+            orders: orders with restaurants, sorted list of
+                (restaurant name, distance in km or None)
+        """
+        orders = list(self)
+        order_ids = [order.id for order in orders if order.status == Order.UNPROCESSED]
+        missing_order_ids = [
+            order.id for order in orders
+            if order.status == Order.UNPROCESSED and order.restaurants_refreshed_at is None
+        ]
+        if missing_order_ids:
+            OrderRestaurant.objects.refresh(order_ids=missing_order_ids)
+
+        restaurants_rows = OrderRestaurant.objects.filter(order__in=order_ids) \
+            .order_by(F('distance').asc(nulls_last=True), 'restaurant') \
+            .values_list('order', 'restaurant__name', 'distance')
+        orders_restaurants = defaultdict(list)
+        for order_id, restaurant_name, distance in restaurants_rows:
+            if distance is not None:
+                distance = round(distance, 3)
+            orders_restaurants[order_id].append((restaurant_name, distance))
+
+        for order in orders:
+            order.restaurants = orders_restaurants[order.id]
+        return orders
+
+    def bulk_create_with_products(self, orders_with_products):
+        """Save new orders with their lines in one transaction.
+
+        Orders are inserted with one query on databases which return ids
+        from bulk inserts, like PostgreSQL, and one by one elsewhere. Lines
+        of all orders are inserted with one query. Addresses are put in the
+        geocoding queue once the caller's transaction is committed, rows of
+        OrderRestaurant are calculated later by `geocode_places` command.
+
+        Args:
+            orders_with_products: list of (order, list of order products)
+        """
+        orders = [order for order, order_products in orders_with_products]
+        with transaction.atomic(using=self.db):
+            if connections[self.db].features.can_return_rows_from_bulk_insert:
+                self.bulk_create(orders)
+            else:
+                for order in orders:
+                    order.save(using=self.db)
+            all_order_products = []
+            for order, order_products in orders_with_products:
+                for order_product in order_products:
+                    order_product.order = order
+                all_order_products.extend(order_products)
+            OrderProduct.objects.using(self.db).bulk_create(all_order_products)
+            transaction.on_commit(
+                lambda: Place.objects.enqueue(order.address for order in orders), using=self.db
+            )
+
+    def with_status(self, status):
+        """Filter orders by status, any unknown status means all orders."""
+        if status not in dict(Order.STATUS_CHOISES):
+            return self
+        return self.filter(status=status)
+
+    def get_page_with_restaurants(self, after_id=None, per_page=ORDERS_PER_PAGE):
+        """Get a page of orders with restaurants and distances to them.
+
+        Pages are addressed by a cursor, the id of the last order of the
+        previous page, so the cost of a page doesn't depend on its position.
 
-        sorted_orders = sorted(list(orders), key=lambda order: order.id)
-        for order in sorted_orders:
-            # order.restaurants is dict of resta_name: distance_to_resta
-            order.restaurants = sorted(order.restaurants.items(), key=lambda rest: rest[1])
-        return sorted_orders
+        Returns:
+            orders: orders of the page sorted by id, see fetch_with_restaurants
+            next_after_id: cursor of the next page or None for the last page
+        """
+        orders = self.order_by('id')
+        if after_id is not None:
+            orders = orders.filter(id__gt=after_id)
+        orders = orders[:per_page + 1].fetch_with_restaurants()
+        if len(orders) <= per_page:
+            return orders, None
+        orders = orders[:per_page]
+        return orders, orders[-1].id
+
+    def iterate_with_restaurants(self, chunk_size=ORDERS_PER_PAGE):
+        """Iterate over orders with restaurants, loading them chunk by chunk.
+
+        Memory use depends on the chunk size only, not on the number of
+        orders, see fetch_with_restaurants.
+        """
+        after_id = None
+        while True:
+            orders, after_id = self.get_page_with_restaurants(after_id, chunk_size)
+            yield from orders
+            if after_id is None:
+                return
 
 
 class Order(models.Model):
@@ -145,15 +489,28 @@ class Order(models.Model):
     delivered_at = models.DateTimeField('доставлен в', blank=True, null=True)
     payment_method = models.CharField('способ оплаты', max_length=3,
                                       choices=PAYMENT_METHOD_CHOICES, default=CASH)
+    total_price = models.DecimalField('стоимость', max_digits=10, decimal_places=2, default=0)
+    # rows of OrderRestaurant are calculated, see OrderRestaurantQuerySet.refresh
+    restaurants_refreshed_at = models.DateTimeField('рестораны подобраны в', null=True, blank=True,
+                                                    editable=False)
 
     objects = OrderQuerySet.as_manager()
 
     def __str__(self):
         return f'{self.firstname} {self.lastname} {self.address}'
 
+    def update_total_price(self):
+        """Recalculate order cost after its products have changed."""
+        self.total_price = self.products.aggregate(total=Sum('total_price'))['total'] or 0
+        self.save(update_fields=['total_price'])
+
     class Meta:
         verbose_name = 'заказ'
         verbose_name_plural = 'заказы'
+        indexes = [
+            # orders page: orders with status after the cursor ordered by id
+            models.Index(fields=['status', 'id'], name='order_status_id_idx'),
+        ]
 
 
 class OrderProduct(models.Model):
@@ -166,3 +523,295 @@ class OrderProduct(models.Model):
     class Meta:
         verbose_name = 'продукт заказа'
         verbose_name_plural = 'продукты заказа'
+        indexes = [
+            # covers fetching products of orders, see get_capable_restaurant_ids
+            models.Index(fields=['order', 'product'], name='orderproduct_order_product_idx'),
+        ]
+
+
+class OrderRestaurantQuerySet(models.QuerySet):
+    def refresh(self, order_ids=None):
+        """Recalculate rows of the orders.
+
+        An unprocessed order gets rows of restaurants able to cook it:
+        NEAREST_RESTAURANTS_COUNT nearest of them within MAX_DELIVERY_DISTANCE,
+        found with the spatial index, and the ones with unknown distance while
+        any of the addresses waits for geocoding. Rows of the other orders are
+        deleted. Menus are checked in the database rather than in a cache,
+        which may lag behind in other processes. Orders are recalculated chunk
+        by chunk, a chunk takes a few queries.
+
+        Args:
+            order_ids: orders to recalculate, all unprocessed ones by default
+        """
+        if order_ids is None:
+            order_ids = Order.objects.unprocessed().values_list('id', flat=True)
+        order_ids = sorted(set(order_ids))
+        if not order_ids:
+            return
+        restaurants = list(Restaurant.objects.only('id', 'address'))
+        menus_masks = fetch_menus_masks([restaurant.id for restaurant in restaurants])
+        restaurants_coords = self._get_restaurants_coords(restaurants)
+        for start in range(0, len(order_ids), ORDER_RESTAURANTS_CHUNK_SIZE):
+            self._refresh_orders_chunk(order_ids[start:start + ORDER_RESTAURANTS_CHUNK_SIZE],
+                                       menus_masks, restaurants_coords)
+
+    def _refresh_orders_chunk(self, order_ids, menus_masks, restaurants_coords):
+        orders = Order.objects.filter(id__in=order_ids).unprocessed()
+        capable_restaurants = orders.get_capable_restaurant_ids(menus_masks)
+        orders = list(orders.only('id', 'address'))
+        orders_coords = Place.objects.get_coordinates([order.address for order in orders])
+        restaurants_index = get_restaurants_index(restaurants_coords)
+
+        rows = []
+        candidate_pairs = []
+        for order in orders:
+            restaurant_ids = capable_restaurants.get(order.id, [])
+            order_coords = orders_coords.get(order.address)
+            rows.extend(
+                OrderRestaurant(order_id=order.id, restaurant_id=restaurant_id)
+                for restaurant_id in restaurant_ids
+                if order_coords is None or restaurant_id not in restaurants_coords
+            )
+            if order_coords is not None and restaurant_ids:
+                candidate_pairs.extend(
+                    (order.id, order_coords, restaurant_id)
+                    for restaurant_id in self._find_nearest_candidates(restaurants_index,
+                                                                       order_coords, restaurant_ids)
+                )
+
+        distances = get_distances(
+            [order_coords for order_id, order_coords, restaurant_id in candidate_pairs],
+            [restaurants_coords[restaurant_id] for order_id, order_coords, restaurant_id in candidate_pairs],
+            accurate=True,
+        )
+        orders_nearest = defaultdict(list)
+        for (order_id, order_coords, restaurant_id), distance in zip(candidate_pairs, distances.tolist()):
+            if distance <= settings.MAX_DELIVERY_DISTANCE:
+                orders_nearest[order_id].append((distance, restaurant_id))
+        for order_id, nearest in orders_nearest.items():
+            rows.extend(
+                OrderRestaurant(order_id=order_id, restaurant_id=restaurant_id, distance=distance)
+                for distance, restaurant_id in sorted(nearest)[:settings.NEAREST_RESTAURANTS_COUNT]
+            )
+
+        with transaction.atomic(using=self.db):
+            # the page and the worker may refresh the same new order at once, the second
+            # refresh waits for the first one and replaces its rows instead of failing
+            # on unique_together, SQLite has no row locks but serializes writes anyway
+            if connections[self.db].features.has_select_for_update:
+                list(Order.objects.using(self.db).select_for_update().filter(id__in=order_ids)
+                     .order_by('id').values_list('id', flat=True))
+            self.filter(order__in=order_ids).delete()
+            self.bulk_create(rows)
+            Order.objects.using(self.db).filter(id__in=order_ids) \
+                .update(restaurants_refreshed_at=timezone.now())
+
+    @staticmethod
+    def _get_restaurants_coords(restaurants) -> dict:
+        coords = Place.objects.get_coordinates([restaurant.address for restaurant in restaurants])
+        return {
+            restaurant.id: coords[restaurant.address]
+            for restaurant in restaurants if restaurant.address in coords
+        }
+
+    @staticmethod
+    def _find_nearest_candidates(restaurants_index, coords, restaurant_ids) -> list:
+        """Find restaurants which may be the nearest by accurate distance.
+
+        Index ranks restaurants by distance over the sphere, so restaurants
+        within its error from the nearest ones are candidates too.
+
+        Returns:
+            restaurant_ids: ids of candidate restaurants
+        """
+        count = settings.NEAREST_RESTAURANTS_COUNT
+        margin = (1 + HAVERSINE_MAX_ERROR) / (1 - HAVERSINE_MAX_ERROR)
+        max_distance = settings.MAX_DELIVERY_DISTANCE * margin
+        candidates = restaurants_index.find_nearest(coords, count, max_distance, restaurant_ids)
+        if candidates and len(candidates) == count:
+            max_distance = min(max_distance, candidates[-1][1] * margin)
+            candidates = restaurants_index.find_nearest(coords, None, max_distance, restaurant_ids)
+        return [rest_id for rest_id, distance in candidates]
+
+    def refresh_restaurants(self, restaurant_ids, order_ids=None):
+        """Recalculate orders the restaurants may be added to or removed from.
+
+        Called when restaurants are added or moved, or their menus change.
+        Only orders listing the restaurants already, and orders the
+        restaurants are able to cook and are nearer to than the farthest of
+        their nearest restaurants, are recalculated, see refresh. Distances
+        are calculated between the restaurants and the orders only.
+
+        Args:
+            restaurant_ids: changed restaurants
+            order_ids: orders to check, all unprocessed ones by default
+        """
+        if order_ids is None:
+            order_ids = Order.objects.unprocessed().values_list('id', flat=True)
+        order_ids = sorted(set(order_ids))
+        if not order_ids:
+            return
+        restaurants = list(Restaurant.objects.filter(id__in=restaurant_ids).only('id', 'address'))
+        menus_masks = fetch_menus_masks([restaurant.id for restaurant in restaurants])
+        restaurants_coords = self._get_restaurants_coords(restaurants)
+        affected_order_ids = set()
+        for start in range(0, len(order_ids), ORDER_RESTAURANTS_CHUNK_SIZE):
+            affected_order_ids |= self._find_affected_orders(
+                order_ids[start:start + ORDER_RESTAURANTS_CHUNK_SIZE],
+                restaurant_ids, menus_masks, restaurants_coords,
+            )
+        self.refresh(order_ids=affected_order_ids)
+
+    def _find_affected_orders(self, order_ids, restaurant_ids, menus_masks, restaurants_coords) -> set:
+        affected_order_ids = set(
+            self.filter(order__in=order_ids, restaurant__in=restaurant_ids)
+            .values_list('order', flat=True)
+        )
+        orders = Order.objects.filter(id__in=order_ids).unprocessed()
+        capable_restaurants = {
+            order_id: rest_ids
+            for order_id, rest_ids in orders.get_capable_restaurant_ids(menus_masks).items()
+            if rest_ids
+        }
+        if not capable_restaurants:
+            return affected_order_ids
+        orders = list(orders.filter(id__in=capable_restaurants).only('id', 'address'))
+        orders_coords = Place.objects.get_coordinates([order.address for order in orders])
+        orders_farthest = {
+            row['order']: (row['count'], row['farthest_distance'])
+            for row in self.filter(order__in=capable_restaurants, distance__isnull=False)
+            .values('order').annotate(count=Count('id'), farthest_distance=Max('distance'))
+            .order_by()
+        }
+
+        located_pairs = []
+        for order in orders:
+            for restaurant_id in capable_restaurants[order.id]:
+                if order.address in orders_coords and restaurant_id in restaurants_coords:
+                    located_pairs.append((order, restaurant_id))
+                else:
+                    # listed with unknown distance
+                    affected_order_ids.add(order.id)
+        distances = get_distances(
+            [orders_coords[order.address] for order, restaurant_id in located_pairs],
+            [restaurants_coords[restaurant_id] for order, restaurant_id in located_pairs],
+            accurate=True,
+        )
+        for (order, restaurant_id), distance in zip(located_pairs, distances.tolist()):
+            count, farthest_distance = orders_farthest.get(order.id, (0, None))
+            if distance <= settings.MAX_DELIVERY_DISTANCE and \
+                    (count < settings.NEAREST_RESTAURANTS_COUNT or distance < farthest_distance):
+                affected_order_ids.add(order.id)
+        return affected_order_ids
+
+    def refresh_new_orders(self) -> int:
+        """Calculate rows of a chunk of unprocessed orders never calculated, e.g. new ones.
+
+        Returns:
+            refreshed_count: number of orders calculated
+        """
+        order_ids = list(
+            Order.objects.unprocessed().filter(restaurants_refreshed_at__isnull=True)
+            .values_list('id', flat=True)[:ORDER_RESTAURANTS_CHUNK_SIZE]
+        )
+        self.refresh(order_ids=order_ids)
+        return len(order_ids)
+
+    def refresh_menu_item(self, restaurant_id, product_id, available):
+        """Recalculate unprocessed orders with the product after its availability has changed.
+
+        A product becoming unavailable can only remove the restaurant from
+        orders listing it. That is also the case of a restaurant being
+        deleted, its rows are deleted before its menu items, so there is
+        nothing to recalculate.
+        """
+        orders = Order.objects.unprocessed().filter(products__product=product_id)
+        if available:
+            self.refresh_restaurants([restaurant_id], orders.values_list('id', flat=True).distinct())
+        else:
+            self.refresh(order_ids=self.filter(restaurant=restaurant_id, order__in=orders)
+                         .values_list('order', flat=True))
+
+    def refresh_places(self, normalized_addresses):
+        """Recalculate orders after their or their restaurants addresses have been found.
+
+        An order is waiting for coordinates if it lists a restaurant with
+        unknown distance, only such orders are looked through.
+        """
+        normalized_addresses = set(normalized_addresses)
+        if not normalized_addresses:
+            return
+        found_restaurant_ids = [
+            restaurant.id for restaurant in Restaurant.objects.only('id', 'address')
+            if normalize_address(restaurant.address) in normalized_addresses
+        ]
+        if found_restaurant_ids:
+            self.refresh_restaurants(found_restaurant_ids)
+
+        unlocated_orders = self.filter(distance__isnull=True) \
+            .values_list('order', 'order__address').distinct()
+        self.refresh(order_ids=[
+            order_id for order_id, address in unlocated_orders
+            if normalize_address(address) in normalized_addresses
+        ])
+
+
+class OrderRestaurant(models.Model):
+    """Restaurant listed for an unprocessed order, see OrderRestaurantQuerySet.refresh."""
+    order = models.ForeignKey(Order, verbose_name='заказ', on_delete=models.CASCADE,
+                              related_name='order_restaurants')
+    restaurant = models.ForeignKey(Restaurant, verbose_name='ресторан', on_delete=models.CASCADE,
+                                   related_name='order_restaurants')
+    distance = models.FloatField('расстояние, км', null=True, blank=True)
+
+    objects = OrderRestaurantQuerySet.as_manager()
+
+    def __str__(self):
+        return f'{self.order_id} - {self.restaurant_id}'
+
+    class Meta:
+        verbose_name = 'ресторан заказа'
+        verbose_name_plural = 'рестораны заказов'
+        unique_together = [
+            ['order', 'restaurant']
+        ]
+        indexes = [
+            # looking for orders waiting for coordinates, see refresh_places
+            models.Index(fields=['distance'], name='orderrest_distance_idx'),
+        ]
+
+
+class IdempotencyKeyQuerySet(models.QuerySet):
+    def expired(self):
+        expired_at = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+        return self.filter(created_at__lt=expired_at)
+
+    def get_fresh(self, key):
+        """Get stored response for the key, dropping it if it has expired."""
+        idempotency_key = self.filter(key=key).first()
+        if idempotency_key and idempotency_key.is_expired():
+            idempotency_key.delete()
+            return None
+        return idempotency_key
+
+
+class IdempotencyKey(models.Model):
+    MAX_LENGTH = 100
+
+    key = models.CharField('ключ', max_length=MAX_LENGTH, unique=True)
+    response_status = models.PositiveSmallIntegerField('статус ответа')
+    response_body = models.TextField('тело ответа')
+    created_at = models.DateTimeField('создан в', default=timezone.now, db_index=True)
+
+    objects = IdempotencyKeyQuerySet.as_manager()
+
+    def __str__(self):
+        return self.key
+
+    def is_expired(self):
+        return self.created_at < timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+    class Meta:
+        verbose_name = 'ключ идемпотентности'
+        verbose_name_plural = 'ключи идемпотентности'
@@ -0,0 +1,179 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+_request_metrics = ContextVar('request_metrics', default=None)
+
+_views_metrics = defaultdict(lambda: defaultdict(int))
+_views_metrics_lock = threading.Lock()
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class RequestMetrics:
+    """Counters of work done while handling one request.
+
+    Counters are updated from threads started by the request too, e.g.
+    by parallel geocoder calls, so updates are guarded with a lock.
+    """
+    def __init__(self):
+        self.view_name = None
+        self.queries_count = 0
+        self.queries_duration = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.geocoder_calls = 0
+        self.geocoder_duration = 0
+        self._lock = threading.Lock()
+
+    def record_query(self, duration):
+        with self._lock:
+            self.queries_count += 1
+            self.queries_duration += duration
+
+    def record_cache_lookup(self, hits, misses):
+        with self._lock:
+            self.cache_hits += hits
+            self.cache_misses += misses
+
+    def record_geocoder_call(self, duration):
+        with self._lock:
+            self.geocoder_calls += 1
+            self.geocoder_duration += duration
+
+    def get_server_timing(self, duration):
+        return ', '.join([
+            f'db;dur={self.queries_duration * 1000:.1f};desc="{self.queries_count} queries"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f'geocoder;dur={self.geocoder_duration * 1000:.1f};desc="{self.geocoder_calls} calls"',
+            f'total;dur={duration * 1000:.1f}',
+        ])
+
+
+def get_request_metrics():
+    """Get metrics of the current request or None outside of request."""
+    return _request_metrics.get()
+
+
+def record_cache_lookup(hits, misses):
+    metrics = get_request_metrics()
+    if metrics:
+        metrics.record_cache_lookup(hits, misses)
+
+
+def record_geocoder_call(duration):
+    metrics = get_request_metrics()
+    if metrics:
+        metrics.record_geocoder_call(duration)
+
+
+def get_views_metrics() -> dict:
+    """Get metrics aggregated by view since the process has started."""
+    with _views_metrics_lock:
+        return {view_name: dict(metrics) for view_name, metrics in _views_metrics.items()}
+
+
+def _aggregate_view_metrics(metrics, duration):
+    with _views_metrics_lock:
+        view_metrics = _views_metrics[metrics.view_name]
+        view_metrics['requests'] += 1
+        view_metrics['duration'] += duration
+        view_metrics['queries_count'] += metrics.queries_count
+        view_metrics['max_queries_count'] = max(view_metrics['max_queries_count'],
+                                                metrics.queries_count)
+        view_metrics['queries_duration'] += metrics.queries_duration
+        view_metrics['cache_hits'] += metrics.cache_hits
+        view_metrics['cache_misses'] += metrics.cache_misses
+        view_metrics['geocoder_calls'] += metrics.geocoder_calls
+        view_metrics['geocoder_duration'] += metrics.geocoder_duration
+
+
+class ProfilingMiddleware:
+    """Record queries, cache lookups and geocoder calls of every view.
+
+    Metrics of the request are sent in Server-Timing header and aggregated
+    by view, see get_views_metrics. Views exceeding their budget from
+    QUERY_BUDGETS setting are logged, or fail with QueryBudgetExceeded
+    when QUERY_BUDGET_STRICT setting is on, e.g. in tests.
+
+    Streaming responses are made while they are sent, after the view has
+    returned, so their metrics are aggregated and checked against the budget
+    when the whole content is sent. Server-Timing header is sent before the
+    content and shows the work done by the view only.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        started_at = time.perf_counter()
+        with self.profile(metrics):
+            response = self.get_response(request)
+        response['Server-Timing'] = metrics.get_server_timing(time.perf_counter() - started_at)
+
+        if response.streaming:
+            response.streaming_content = self.stream_content(response.streaming_content,
+                                                             metrics, started_at)
+        else:
+            self.finish(metrics, time.perf_counter() - started_at)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        get_request_metrics().view_name = getattr(view_func, '__name__', None)
+
+    @contextmanager
+    def profile(self, metrics):
+        metrics_token = _request_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self.record_query))
+                yield
+        finally:
+            _request_metrics.reset(metrics_token)
+
+    def stream_content(self, streaming_content, metrics, started_at):
+        chunks = iter(streaming_content)
+        while True:
+            with self.profile(metrics):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+        self.finish(metrics, time.perf_counter() - started_at)
+
+    def finish(self, metrics, duration):
+        if metrics.view_name:
+            _aggregate_view_metrics(metrics, duration)
+            self.check_query_budget(metrics)
+
+    @staticmethod
+    def record_query(execute, sql, params, many, context):
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics = get_request_metrics()
+            if metrics:
+                metrics.record_query(time.perf_counter() - started_at)
+
+    @staticmethod
+    def check_query_budget(metrics):
+        budget = settings.QUERY_BUDGETS.get(metrics.view_name)
+        if budget is None or metrics.queries_count <= budget:
+            return
+        message = f'{metrics.view_name} made {metrics.queries_count} queries, budget is {budget}'
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -1,9 +1,12 @@
-from rest_framework.serializers import ModelSerializer, ValidationError
+from rest_framework.serializers import IntegerField, ModelSerializer, ValidationError
 
 from .models import Order, OrderProduct, Product, ProductCategory
 
 
 class OrderProductSerializer(ModelSerializer):
+    # Products of all order lines are fetched at once in OrderSerializer
+    product = IntegerField()
+
     class Meta:
         model = OrderProduct
         fields = ['product', 'quantity']
@@ -13,9 +16,29 @@ class OrderSerializer(ModelSerializer):
     products = OrderProductSerializer(many=True, write_only=True)
 
     def validate_products(self, value):
-        """Empty list validation."""
+        """Empty list validation and fetching products of all lines with one query.
+
+        Products can be passed in `products` context item, a dict of
+        product_id: product, to validate a batch of orders with one query.
+        """
         if not value:
             raise ValidationError('Got empty products list.')
+
+        if 'products' in self.context:
+            # Products are already fetched for the whole batch of orders
+            products = self.context['products']
+        else:
+            products = Product.objects.in_bulk(
+                {order_product['product'] for order_product in value}
+            )
+        invalid_ids = sorted(
+            {order_product['product'] for order_product in value} - products.keys()
+        )
+        if invalid_ids:
+            raise ValidationError(f'Invalid product ids: {invalid_ids}.')
+
+        for order_product in value:
+            order_product['product'] = products[order_product['product']]
         return value
 
     class Meta:
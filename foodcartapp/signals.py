@@ -0,0 +1,62 @@
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import geocoders
+from .catalogue import reset_product_catalogue
+from .models import (OrderRestaurant, Place, Product, ProductCategory, Restaurant,
+                     RestaurantMenuItem, get_place_coords_key)
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=ProductCategory)
+@receiver([post_save, post_delete], sender=Restaurant)
+@receiver([post_save, post_delete], sender=RestaurantMenuItem)
+def reset_catalogue(sender, **kwargs):
+    reset_product_catalogue()
+
+
+@receiver([post_save, post_delete], sender=Place)
+def reset_place_coords(sender, instance, **kwargs):
+    caches['places'].delete(get_place_coords_key(instance.normalized_address))
+
+
+@receiver([post_save, post_delete], sender=RestaurantMenuItem)
+def refresh_menu_item_orders(sender, instance, signal, raw=False, **kwargs):
+    if not raw:
+        OrderRestaurant.objects.refresh_menu_item(
+            instance.restaurant_id, instance.product_id,
+            available=signal is post_save and instance.availability,
+        )
+
+
+@receiver(pre_save, sender=Restaurant)
+def remember_restaurant_address(sender, instance, **kwargs):
+    instance.saved_address = Restaurant.objects.filter(pk=instance.pk) \
+        .values_list('address', flat=True).first()
+
+
+@receiver(post_save, sender=Restaurant)
+def refresh_restaurant_orders(sender, instance, created, raw, **kwargs):
+    if not raw and (created or instance.address != instance.saved_address):
+        OrderRestaurant.objects.refresh_restaurants([instance.id])
+
+
+@receiver(pre_delete, sender=Restaurant)
+def remember_restaurant_orders(sender, instance, **kwargs):
+    instance.listed_order_ids = list(
+        OrderRestaurant.objects.filter(restaurant=instance).values_list('order', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Restaurant)
+def refresh_deleted_restaurant_orders(sender, instance, **kwargs):
+    # other restaurants take place of the deleted one
+    OrderRestaurant.objects.refresh(order_ids=instance.listed_order_ids)
+
+
+@receiver(setting_changed)
+def reset_geocoders(sender, setting, **kwargs):
+    if setting.startswith('GEOCODER_'):
+        geocoders.reset_geocoders()
@@ -0,0 +1,120 @@
+import heapq
+
+import numpy as np
+
+from .distances import EARTH_RADIUS_KM
+
+
+_restaurants_index = None
+
+
+def _to_unit_vectors(coords) -> np.ndarray:
+    lats, lons = np.radians(np.asarray(coords, dtype=float).reshape(-1, 2)).T
+    return np.column_stack([np.cos(lats) * np.cos(lons), np.cos(lats) * np.sin(lons), np.sin(lats)])
+
+
+def _get_distance(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(min(chord / 2, 1.0))
+
+
+class RestaurantsIndex:
+    """k-d tree of restaurants to find the nearest ones to a point.
+
+    Points are kept as unit vectors in 3D, so the straight line distance
+    between them, the chord, grows with the distance over the sphere and
+    the tree works near the poles and the antimeridian as well.
+    """
+    LEAF_SIZE = 32
+
+    def __init__(self, restaurants_coords):
+        """Build the index.
+
+        Args:
+            restaurants_coords: dict of restaurant_id: (lat, lon)
+        """
+        self.restaurants_coords = dict(restaurants_coords)
+        self._restaurant_ids = list(self.restaurants_coords)
+        self._restaurant_ids_array = np.array(self._restaurant_ids)
+        self._points = _to_unit_vectors(list(self.restaurants_coords.values()))
+        self._root = self._build(np.arange(len(self._restaurant_ids)))
+
+    def _build(self, indexes):
+        if len(indexes) <= self.LEAF_SIZE:
+            return indexes
+        points = self._points[indexes]
+        axis = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+        indexes = indexes[np.argsort(points[:, axis], kind='stable')]
+        middle = len(indexes) // 2
+        split = self._points[indexes[middle], axis]
+        return axis, split, self._build(indexes[:middle]), self._build(indexes[middle:])
+
+    def find_nearest(self, coords, count=None, max_distance=None, restaurant_ids=None) -> list:
+        """Find restaurants nearest to the point.
+
+        Args:
+            coords: (lat, lon) of the point
+            count: max number of restaurants to find, all by default
+            max_distance: max distance to a restaurant in kilometers
+            restaurant_ids: restaurants to choose from, all by default
+
+        Returns:
+            restaurants_distances: list of (restaurant_id, distance) sorted
+                by distance in kilometers over the sphere
+        """
+        point = _to_unit_vectors(coords)[0]
+        count = len(self._restaurant_ids) if count is None else count
+        max_chord = 2.0
+        if max_distance is not None:
+            max_chord = 2 * np.sin(min(max_distance / EARTH_RADIUS_KM, np.pi) / 2)
+        allowed = None
+        if restaurant_ids is not None:
+            allowed = np.isin(self._restaurant_ids_array, list(restaurant_ids))
+
+        # max-heap of (-chord, index) of the nearest restaurants found so far
+        nearest = []
+
+        def get_bound():
+            return max_chord if len(nearest) < count else -nearest[0][0]
+
+        def search(node):
+            if isinstance(node, np.ndarray):
+                if allowed is not None:
+                    node = node[allowed[node]]
+                chords = np.linalg.norm(self._points[node] - point, axis=1)
+                close = chords <= get_bound()
+                node, chords = node[close], chords[close]
+                if len(node) > count:
+                    nearest_in_leaf = np.argpartition(chords, count - 1)[:count]
+                    node, chords = node[nearest_in_leaf], chords[nearest_in_leaf]
+                for index, chord in zip(node.tolist(), chords.tolist()):
+                    if len(nearest) < count:
+                        heapq.heappush(nearest, (-chord, index))
+                    elif chord < -nearest[0][0]:
+                        heapq.heapreplace(nearest, (-chord, index))
+                return
+            axis, split, left, right = node
+            difference = point[axis] - split
+            near, far = (right, left) if difference >= 0 else (left, right)
+            search(near)
+            if abs(difference) <= get_bound():
+                search(far)
+
+        if count > 0 and self._restaurant_ids:
+            search(self._root)
+        return [
+            (self._restaurant_ids[index], _get_distance(-negative_chord))
+            for negative_chord, index in sorted(nearest, reverse=True)
+        ]
+
+
+def get_restaurants_index(restaurants_coords) -> RestaurantsIndex:
+    """Get index of restaurants, rebuilt only when their coordinates change.
+
+    Args:
+        restaurants_coords: dict of restaurant_id: (lat, lon)
+    """
+    global _restaurants_index
+    index = _restaurants_index
+    if index is None or index.restaurants_coords != restaurants_coords:
+        index = _restaurants_index = RestaurantsIndex(restaurants_coords)
+    return index
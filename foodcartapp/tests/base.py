@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase
+
+from foodcartapp.catalogue import reset_product_catalogue
+from foodcartapp.models import Product, Restaurant, RestaurantMenuItem
+
+
+class CatalogueTestCase(TestCase):
+    """Restaurants selling every product of the catalogue.
+
+    Every test starts with empty caches and a new version of the catalogue,
+    as after a change of the catalogue: nothing is rendered for it yet.
+    """
+
+    restaurants_count = 3
+    products_count = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurants = [
+            Restaurant.objects.create(name=f'Star Burger {number}', address=f'Москва, Тверская, {number}')
+            for number in range(cls.restaurants_count)
+        ]
+        cls.products = [
+            Product.objects.create(name=f'Бургер {number}', price=100 + number, image='burger.jpg')
+            for number in range(cls.products_count)
+        ]
+        RestaurantMenuItem.objects.bulk_create([
+            RestaurantMenuItem(restaurant=restaurant, product=product)
+            for restaurant in cls.restaurants for product in cls.products
+        ])
+
+    def setUp(self):
+        for alias in settings.CACHES:
+            caches[alias].clear()
+        reset_product_catalogue()
+
+    def get_order_data(self, address='Москва, Новый Арбат, 10'):
+        return {
+            'firstname': 'Иван',
+            'lastname': 'Петров',
+            'phonenumber': '+79291000000',
+            'address': address,
+            'products': [{'product': product.id, 'quantity': 2} for product in self.products],
+        }
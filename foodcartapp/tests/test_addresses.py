@@ -0,0 +1,82 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TransactionTestCase
+
+from foodcartapp.utils import normalize_address
+
+
+class NormalizeAddressTest(SimpleTestCase):
+    def assertSameAddress(self, address, other_address):
+        self.assertEqual(normalize_address(address), normalize_address(other_address))
+
+    def test_abbreviations_and_implied_words(self):
+        self.assertEqual(normalize_address('ул. Ленина 5'), 'ленина 5')
+        self.assertSameAddress('г. Москва, ул. Ленина, д. 5', 'Москва, Ленина 5')
+        self.assertSameAddress('пр-т Мира, д. 1, корп. 2', 'проспект Мира 1 корпус 2')
+        self.assertSameAddress('Ленинский просп., 10', 'Ленинский пр-т 10')
+
+    def test_punctuation_and_spaces(self):
+        self.assertSameAddress('Ленина, 5', 'Ленина 5')
+        self.assertSameAddress('  Ленина,   5  ', 'Ленина 5')
+        self.assertSameAddress('Ленина 5/1', 'Ленина, 5/1')
+
+    def test_case_and_yo(self):
+        self.assertSameAddress('Щёлковское шоссе, 5', 'щелковское ш 5')
+
+    def test_different_addresses(self):
+        self.assertNotEqual(normalize_address('Ленина 5'), normalize_address('Ленина 15'))
+        self.assertNotEqual(normalize_address('Ленина 5/1'), normalize_address('Ленина 51'))
+        self.assertNotEqual(normalize_address('пер. Мира 1'), normalize_address('пр-т Мира 1'))
+
+
+class RenormalizePlacesMigrationTest(TransactionTestCase):
+    """Places are renormalized by migration 0047, see renormalize_places."""
+
+    migrate_from = [('foodcartapp', '0046_dashboard_indexes')]
+    migrate_to = [('foodcartapp', '0047_renormalize_places')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        self.Place = executor.loader.project_state(self.migrate_from).apps.get_model('foodcartapp', 'Place')
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def migrate(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+        Place = executor.loader.project_state(self.migrate_to).apps.get_model('foodcartapp', 'Place')
+        return {
+            place.address: place.normalized_address
+            for place in Place.objects.all()
+        }
+
+    def create_place(self, address, normalized_address, status='FND', fetched_at='2020-01-01T00:00Z'):
+        return self.Place.objects.create(address=address, normalized_address=normalized_address,
+                                         status=status, fetched_at=fetched_at, lat=55.7, lon=37.6)
+
+    def test_colliding_places_are_merged(self):
+        self.create_place('Москва, ул. Ленина, 5', 'москва ул ленина 5')
+        self.create_place('Москва, Ленина 5', 'москва ленина 5', fetched_at='2020-01-02T00:00Z')
+        self.create_place('Москва, Арбат, 1', 'москва арбат 1')
+        self.assertEqual(self.migrate(), {
+            'Москва, Ленина 5': 'москва ленина 5',
+            'Москва, Арбат, 1': 'москва арбат 1',
+        })
+
+    def test_found_place_is_preferred(self):
+        self.create_place('Москва, ул. Ленина, 5', 'москва ул ленина 5')
+        self.create_place('Москва, Ленина 5', 'москва ленина 5', status='NFD',
+                          fetched_at='2020-01-02T00:00Z')
+        self.assertEqual(self.migrate(), {'Москва, ул. Ленина, 5': 'москва ленина 5'})
+
+    def test_places_swapping_addresses(self):
+        # each place is normalized to the old normalized address of the other one
+        self.create_place('Мира, 1', 'пер мира 1')
+        self.create_place('пер. Мира 1', 'мира 1')
+        self.assertEqual(self.migrate(), {
+            'Мира, 1': 'мира 1',
+            'пер. Мира 1': 'переулок мира 1',
+        })
@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase
+
+from foodcartapp.availability import MenusMasks, fetch_menus_masks, find_capable_restaurants
+from foodcartapp.models import Order, OrderProduct, RestaurantMenuItem
+
+from .base import CatalogueTestCase
+
+
+class FindCapableRestaurantsTest(SimpleTestCase):
+    def test_menu_covers_every_product(self):
+        menus_masks = MenusMasks({1: [10, 2_000_000_000], 2: [10], 3: []})
+        capable_restaurants = find_capable_restaurants({
+            'both': [10, 2_000_000_000],
+            'one': [10],
+            'unknown': [10, 99],
+        }, menus_masks)
+        self.assertEqual(capable_restaurants, {'both': [1], 'one': [1, 2], 'unknown': []})
+
+    def test_masks_do_not_depend_on_product_ids(self):
+        menus_masks = MenusMasks({1: [10, 2_000_000_000], 2: [3_000_000_000]})
+        self.assertEqual(max(mask.bit_length() for mask in menus_masks.masks.values()), 3)
+
+
+class FetchMenusMasksTest(CatalogueTestCase):
+    def test_partial_menu(self):
+        partial_restaurant, *other_restaurants = self.restaurants
+        RestaurantMenuItem.objects.filter(restaurant=partial_restaurant, product=self.products[0]) \
+            .update(availability=False)
+        orders = [
+            Order.objects.create(firstname='Иван', lastname='Петров', phonenumber='+79291000000',
+                                 address='Москва, Арбат, 1')
+            for _ in range(2)
+        ]
+        OrderProduct.objects.bulk_create(
+            [OrderProduct(order=orders[0], product=product, quantity=1, total_price=product.price)
+             for product in self.products] +
+            [OrderProduct(order=orders[1], product=product, quantity=1, total_price=product.price)
+             for product in self.products[1:]]
+        )
+
+        capable_restaurants = Order.objects.filter(id__in=[order.id for order in orders]) \
+            .get_capable_restaurant_ids(fetch_menus_masks())
+        self.assertEqual(capable_restaurants, {
+            orders[0].id: [restaurant.id for restaurant in other_restaurants],
+            orders[1].id: [restaurant.id for restaurant in self.restaurants],
+        })
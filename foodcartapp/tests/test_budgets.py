@@ -0,0 +1,26 @@
+from django.test import override_settings
+
+from foodcartapp.models import Order
+
+from .base import CatalogueTestCase
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class ApiQueryBudgetTest(CatalogueTestCase):
+    """API views fail with QueryBudgetExceeded when they exceed QUERY_BUDGETS."""
+
+    def test_product_list_api(self):
+        response = self.client.get('/api/products/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_register_order(self):
+        response = self.client.post('/api/order/', self.get_order_data(), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_register_order_with_idempotency_key(self):
+        for _ in range(2):
+            response = self.client.post('/api/order/', self.get_order_data(),
+                                        content_type='application/json', HTTP_IDEMPOTENCY_KEY='order-1')
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(Order.objects.count(), 1)
@@ -0,0 +1,99 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase
+
+from foodcartapp.cache import LocalLRUCache, TieredCache
+from foodcartapp.catalogue import VERSION_KEY, get_catalogue_version, reset_product_catalogue
+
+
+class LocalLRUCacheTest(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LocalLRUCache(max_entries=2)
+        cache.set_many({'a': 1, 'b': 2}, expires_at=float('inf'))
+        cache.get_many(['a'])
+        cache.set_many({'c': 3}, expires_at=float('inf'))
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), {'a': 1, 'c': 3})
+
+    @mock.patch('foodcartapp.cache.time')
+    def test_expired_entries(self, time_mock):
+        cache = LocalLRUCache(max_entries=10)
+        time_mock.monotonic.return_value = 100
+        cache.set_many({'a': 1}, expires_at=110)
+        cache.set_many({'b': 2}, expires_at=120)
+        time_mock.monotonic.return_value = 110
+        self.assertEqual(cache.get_many(['a', 'b']), {'b': 2})
+
+    def test_cached_values_are_copies(self):
+        cache = LocalLRUCache(max_entries=10)
+        value = [1]
+        cache.set_many({'a': value}, expires_at=float('inf'))
+        value.append(2)
+        cache.get_many(['a'])['a'].append(3)
+        self.assertEqual(cache.get_many(['a']), {'a': [1]})
+
+
+class TieredCacheTest(TestCase):
+    """Default cache keeps values in process memory in front of the database cache."""
+
+    def setUp(self):
+        self.cache = caches['default']
+        self.shared = caches['shared']
+        self.cache.clear()
+
+    def test_set_reaches_both_tiers(self):
+        self.cache.set('a', 1)
+        self.cache.set_many({'b': 2, 'c': 3})
+        self.assertEqual(self.shared.get_many(['a', 'b', 'c']), {'a': 1, 'b': 2, 'c': 3})
+
+        # changed by another process
+        self.shared.set_many({'a': 10, 'b': 20})
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': 2, 'c': 3})
+
+    def test_get_fills_local_tier(self):
+        self.shared.set('a', 1)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.shared.set('a', 2)
+        self.assertEqual(self.cache.get('a'), 1)
+
+    @mock.patch('foodcartapp.cache.time')
+    def test_local_timeout(self, time_mock):
+        time_mock.monotonic.return_value = 100
+        self.cache.set('a', 1)
+        self.shared.set('a', 2)
+        time_mock.monotonic.return_value = 100 + self.cache._local_timeout
+        self.assertEqual(self.cache.get('a'), 2)
+
+    def test_delete_reaches_both_tiers(self):
+        self.cache.set_many({'a': 1, 'b': 2, 'c': 3})
+        self.cache.delete('a')
+        self.cache.delete_many(['b'])
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']), {'c': 3})
+        self.assertEqual(self.shared.get_many(['a', 'b', 'c']), {'c': 3})
+
+    def test_non_positive_timeout_deletes_from_both_tiers(self):
+        self.cache.set_many({'a': 1, 'b': 2, 'c': 3})
+        self.cache.set('a', 10, timeout=0)
+        self.cache.set_many({'b': 20}, timeout=-1)
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']), {'c': 3})
+        self.assertEqual(self.shared.get_many(['a', 'b', 'c']), {'c': 3})
+
+    def test_without_shared_cache(self):
+        cache = TieredCache('local-only-test', {'OPTIONS': {'SHARED_CACHE': None}})
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(self.shared.get('a'))
+        cache.clear()
+        self.assertIsNone(cache.get('a'))
+
+
+class CatalogueVersionTest(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_version_reset_by_another_process(self):
+        reset_product_catalogue()
+        self.assertEqual(get_catalogue_version(), caches['shared'].get(VERSION_KEY))
+
+        caches['shared'].set(VERSION_KEY, 'new-version', None)
+        self.assertEqual(get_catalogue_version(), 'new-version')
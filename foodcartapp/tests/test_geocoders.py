@@ -0,0 +1,227 @@
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from foodcartapp.geocoders import FixtureGeocoder, GazetteerGeocoder, GeocodeResult
+from foodcartapp.models import GeocoderQuota, Place
+
+
+class GazetteerGeocoderTest(TestCase):
+    addresses_coords = {
+        # the same 16 bytes prefix
+        'Москва, Тверская улица, дом 1': (55.757, 37.613),
+        'Москва, Тверская улица, дом 10': (55.763, 37.606),
+        'Москва, Тверская улица, дом 2': (55.757, 37.612),
+        'Москва, Арбат, 5': (55.751, 37.597),
+        'Санкт-Петербург, Невский проспект, 1': (59.936, 30.318),
+        'Тула, Ленина, 1': (54.193, 37.617),
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        csv_path = os.path.join(cls.temp_dir.name, 'addresses.csv')
+        with open(csv_path, 'w', encoding='utf-8') as csv_file:
+            for address, (lat, lon) in cls.addresses_coords.items():
+                csv_file.write(f'"{address}",{lat},{lon}\n')
+        cls.gazetteer_path = os.path.join(cls.temp_dir.name, 'gazetteer.tsv')
+        call_command('build_gazetteer', csv=[csv_path], output=cls.gazetteer_path,
+                     stdout=open(os.devnull, 'w'))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+        super().tearDownClass()
+
+    def test_finds_every_address(self):
+        with self.settings(GEOCODER_GAZETTEER_PATH=self.gazetteer_path):
+            geocoder = GazetteerGeocoder()
+        for address, (lat, lon) in self.addresses_coords.items():
+            with self.subTest(address=address):
+                self.assertEqual(geocoder.geocode(address), GeocodeResult(GeocodeResult.FOUND, lat, lon))
+
+    def test_finds_address_written_differently(self):
+        with self.settings(GEOCODER_GAZETTEER_PATH=self.gazetteer_path):
+            geocoder = GazetteerGeocoder()
+        self.assertEqual(geocoder.geocode('г. Москва, ул. Тверская, д. 10').status, GeocodeResult.FOUND)
+
+    def test_not_found(self):
+        with self.settings(GEOCODER_GAZETTEER_PATH=self.gazetteer_path):
+            geocoder = GazetteerGeocoder()
+        for address in ['Москва, Тверская улица, дом 3', 'Москва', 'Ярославль, Ленина, 1', 'Яя', '']:
+            with self.subTest(address=address):
+                self.assertEqual(geocoder.geocode(address).status, GeocodeResult.NOT_FOUND)
+
+    def test_empty_gazetteer(self):
+        empty_path = os.path.join(self.temp_dir.name, 'empty.tsv')
+        open(empty_path, 'wb').close()
+        with self.settings(GEOCODER_GAZETTEER_PATH=empty_path):
+            geocoder = GazetteerGeocoder()
+        self.assertEqual(geocoder.geocode('Москва, Арбат, 5').status, GeocodeResult.NOT_FOUND)
+
+
+class FixtureGeocoderTest(TestCase):
+    def test_geocode(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', encoding='utf-8') as fixture_file:
+            json.dump({'Москва, ул. Арбат, д. 5': [55.751, 37.597]}, fixture_file)
+            fixture_file.flush()
+            with self.settings(GEOCODER_FIXTURE_PATH=fixture_file.name):
+                geocoder = FixtureGeocoder()
+        self.assertEqual(geocoder.geocode('москва арбат 5'),
+                         GeocodeResult(GeocodeResult.FOUND, 55.751, 37.597))
+        self.assertEqual(geocoder.geocode('Москва, Арбат, 6').status, GeocodeResult.NOT_FOUND)
+
+
+@override_settings(GEOCODER_RATE_LIMIT=10, GEOCODER_BURST=10, GEOCODER_DAILY_QUOTA=100)
+class GeocoderQuotaTest(TestCase):
+    """Token bucket of geocoder calls, see GeocoderQuotaQuerySet.acquire."""
+
+    def setUp(self):
+        self.now = datetime(2026, 10, 18, 12, tzinfo=timezone.utc)
+        now_patcher = mock.patch('django.utils.timezone.now', lambda: self.now)
+        now_patcher.start()
+        self.addCleanup(now_patcher.stop)
+
+    def acquire_later(self, seconds, calls_count):
+        self.now += timedelta(seconds=seconds)
+        return GeocoderQuota.objects.acquire(calls_count)
+
+    def test_burst_is_granted_partially(self):
+        self.assertEqual(GeocoderQuota.objects.acquire(15), 10)
+        self.assertEqual(GeocoderQuota.objects.acquire(1), 0)
+
+    def test_refill(self):
+        self.assertEqual(GeocoderQuota.objects.acquire(10), 10)
+        self.assertEqual(self.acquire_later(0.05, 10), 0)
+        self.assertEqual(self.acquire_later(0.5, 10), 5)
+        # not refilled over the burst
+        self.assertEqual(self.acquire_later(60, 20), 10)
+
+    def test_daily_quota(self):
+        for _ in range(10):
+            self.acquire_later(10, 10)
+        self.assertEqual(self.acquire_later(10, 10), 0)
+        self.assertEqual(GeocoderQuota.objects.get_today().calls, 100)
+
+        self.assertEqual(self.acquire_later(24 * 60 * 60, 10), 10)
+        self.assertEqual(GeocoderQuota.objects.get_today().calls, 10)
+
+    def test_nothing_to_acquire(self):
+        self.assertEqual(GeocoderQuota.objects.acquire(0), 0)
+        self.assertFalse(GeocoderQuota.objects.exists())
+
+
+class StubGeocoderHandler(BaseHTTPRequestHandler):
+    """Answers like Yandex geocoder, see StubGeocoderTest.addresses_points."""
+
+    def do_GET(self):
+        address = parse_qs(urlparse(self.path).query)['geocode'][0]
+        points = StubGeocoderTest.addresses_points.get(address)
+        if points is None:
+            self.send_error(500)
+            return
+        content = json.dumps({'response': {'GeoObjectCollection': {'featureMember': [
+            {'GeoObject': {'Point': {'pos': point}}} for point in points
+        ]}}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubGeocoderTest(TestCase):
+    """Geocode places with YandexGeocoder talking to a local stub server."""
+
+    addresses_points = {
+        'Москва, Тверская, 1': ['37.613 55.757'],
+        'Нигде, 1': [],
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(('127.0.0.1', 0), StubGeocoderHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        host, port = cls.server.server_address
+        cls.geocoder_settings = override_settings(
+            GEOCODER_BACKENDS=['foodcartapp.geocoders.YandexGeocoder'],
+            GEOCODER_URL=f'http://{host}:{port}/1.x',
+        )
+        cls.geocoder_settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.geocoder_settings.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def geocode(self, address):
+        Place.objects.enqueue([address])
+        started_at = timezone.now()
+        self.assertEqual(Place.objects.geocode_pending(batch_size=10), 1)
+        return Place.objects.get(address=address), started_at, timezone.now()
+
+    def test_found(self):
+        place, _, _ = self.geocode('Москва, Тверская, 1')
+        self.assertEqual(place.status, Place.FOUND)
+        self.assertEqual(place.coords, (55.757, 37.613))
+        self.assertEqual(place.attempts, 0)
+        self.assertIsNone(place.retry_at)
+
+    def test_not_found(self):
+        place, started_at, finished_at = self.geocode('Нигде, 1')
+        self.assertEqual(place.status, Place.NOT_FOUND)
+        self.assertEqual(place.attempts, 0)
+        retry_delay = timedelta(seconds=settings.GEOCODER_NOT_FOUND_TTL)
+        self.assertTrue(started_at + retry_delay <= place.retry_at <= finished_at + retry_delay)
+
+    def test_failed(self):
+        with self.assertLogs('foodcartapp.geocoders', 'WARNING'):
+            place, started_at, finished_at = self.geocode('Москва, Сломанная, 1')
+        self.assertEqual(place.status, Place.PENDING)
+        self.assertEqual(place.attempts, 1)
+        retry_delay = timedelta(seconds=settings.GEOCODER_RETRY_DELAY)
+        self.assertTrue(started_at + retry_delay <= place.retry_at <= finished_at + retry_delay)
+
+        # not retried before retry_at
+        self.assertEqual(Place.objects.geocode_pending(batch_size=10), 0)
+
+    @override_settings(GEOCODER_DAILY_QUOTA=0)
+    def test_over_quota(self):
+        Place.objects.enqueue(['Москва, Тверская, 1'])
+        self.assertEqual(Place.objects.geocode_pending(batch_size=10), 0)
+        place = Place.objects.get()
+        self.assertEqual(place.status, Place.PENDING)
+        self.assertEqual(place.attempts, 0)
+
+    @override_settings(GEOCODER_DAILY_QUOTA=0)
+    def test_over_quota_found_by_next_geocoder(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', encoding='utf-8') as fixture_file:
+            json.dump({'Москва, Арбат, 5': [55.751, 37.597]}, fixture_file)
+            fixture_file.flush()
+            with self.settings(GEOCODER_FIXTURE_PATH=fixture_file.name, GEOCODER_BACKENDS=[
+                'foodcartapp.geocoders.YandexGeocoder', 'foodcartapp.geocoders.FixtureGeocoder',
+            ]):
+                Place.objects.enqueue(['Москва, Арбат, 5', 'Москва, Арбат, 6'])
+                self.assertEqual(Place.objects.geocode_pending(batch_size=10), 1)
+        places_statuses = dict(Place.objects.values_list('address', 'status'))
+        self.assertEqual(places_statuses, {
+            'Москва, Арбат, 5': Place.FOUND,
+            'Москва, Арбат, 6': Place.PENDING,
+        })
@@ -0,0 +1,159 @@
+from django.test import override_settings
+
+from foodcartapp.models import Order, OrderProduct, OrderRestaurant, Place, Restaurant, RestaurantMenuItem
+from foodcartapp.utils import normalize_address
+
+from .base import CatalogueTestCase
+
+
+def locate(address, lat, lon):
+    Place.objects.bulk_upsert([
+        Place(address=address, normalized_address=normalize_address(address),
+              lat=lat, lon=lon, status=Place.FOUND),
+    ])
+
+
+@override_settings(NEAREST_RESTAURANTS_COUNT=2, MAX_DELIVERY_DISTANCE=10)
+class OrderRestaurantTest(CatalogueTestCase):
+    """Rows of OrderRestaurant follow changes of orders, restaurants, menus and places.
+
+    Restaurants are 0.6, 1.7 and 5 km to the south of the order address.
+    """
+
+    order_address = 'Москва, Новый Арбат, 10'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for restaurant, lat in zip(cls.restaurants, [55.70, 55.72, 55.75]):
+            locate(restaurant.address, lat, 37.6)
+        cls.nearest, cls.near, cls.far = [restaurant.id for restaurant in cls.restaurants]
+
+    def create_order(self, address=None, products=None):
+        order = Order(firstname='Иван', lastname='Петров', phonenumber='+79291000000',
+                      address=address or self.order_address)
+        Order.objects.bulk_create_with_products([
+            (order, [OrderProduct(product=product, quantity=1, total_price=product.price)
+                     for product in products or self.products]),
+        ])
+        return order
+
+    def create_located_order(self):
+        locate(self.order_address, 55.705, 37.6)
+        order = self.create_order()
+        OrderRestaurant.objects.refresh(order_ids=[order.id])
+        return order
+
+    def get_rows(self, order):
+        return {
+            restaurant_id: distance if distance is None else round(distance, 1)
+            for restaurant_id, distance in OrderRestaurant.objects.filter(order=order)
+            .values_list('restaurant', 'distance')
+        }
+
+    def test_refresh_lists_nearest_restaurants(self):
+        order = self.create_located_order()
+        self.assertEqual(self.get_rows(order), {self.nearest: 0.6, self.near: 1.7})
+        self.assertIsNotNone(Order.objects.get(id=order.id).restaurants_refreshed_at)
+
+    @override_settings(MAX_DELIVERY_DISTANCE=1)
+    def test_refresh_skips_restaurants_too_far(self):
+        order = self.create_located_order()
+        self.assertEqual(self.get_rows(order), {self.nearest: 0.6})
+
+    def test_refresh_skips_restaurants_unable_to_cook(self):
+        RestaurantMenuItem.objects.filter(restaurant=self.nearest, product=self.products[0]) \
+            .update(availability=False)
+        locate(self.order_address, 55.705, 37.6)
+        order = self.create_order()
+        other_order = self.create_order(products=self.products[1:])
+        OrderRestaurant.objects.refresh()
+        self.assertEqual(self.get_rows(order), {self.near: 1.7, self.far: 5.0})
+        self.assertEqual(self.get_rows(other_order), {self.nearest: 0.6, self.near: 1.7})
+
+    def test_found_place_fills_in_distances(self):
+        order = self.create_order()
+        OrderRestaurant.objects.refresh(order_ids=[order.id])
+        self.assertEqual(self.get_rows(order), {self.nearest: None, self.near: None, self.far: None})
+
+        locate(self.order_address, 55.705, 37.6)
+        self.assertEqual(self.get_rows(order), {self.nearest: 0.6, self.near: 1.7})
+
+    def test_unavailable_product_removes_restaurant(self):
+        order = self.create_located_order()
+        menu_item = RestaurantMenuItem.objects.get(restaurant=self.nearest, product=self.products[0])
+        menu_item.availability = False
+        menu_item.save()
+        self.assertEqual(self.get_rows(order), {self.near: 1.7, self.far: 5.0})
+
+        menu_item.availability = True
+        menu_item.save()
+        self.assertEqual(self.get_rows(order), {self.nearest: 0.6, self.near: 1.7})
+
+    def test_deleted_menu_item_removes_restaurant(self):
+        order = self.create_located_order()
+        RestaurantMenuItem.objects.get(restaurant=self.near, product=self.products[0]).delete()
+        self.assertEqual(self.get_rows(order), {self.nearest: 0.6, self.far: 5.0})
+
+    def test_moved_restaurant(self):
+        order = self.create_located_order()
+        locate('Москва, Новый Арбат, 12', 55.706, 37.6)
+        restaurant = Restaurant.objects.get(id=self.far)
+        restaurant.address = 'Москва, Новый Арбат, 12'
+        restaurant.save()
+        self.assertEqual(self.get_rows(order), {self.far: 0.1, self.nearest: 0.6})
+
+        restaurant.address = 'Москва, Тверская, 2'
+        restaurant.save()
+        self.assertEqual(self.get_rows(order), {self.nearest: 0.6, self.near: 1.7})
+
+    def test_moved_restaurant_waiting_for_coordinates(self):
+        order = self.create_located_order()
+        restaurant = Restaurant.objects.get(id=self.far)
+        restaurant.address = 'Москва, Новый Арбат, 12'
+        restaurant.save()
+        self.assertEqual(self.get_rows(order), {self.nearest: 0.6, self.near: 1.7, self.far: None})
+
+        locate('Москва, Новый Арбат, 12', 55.706, 37.6)
+        self.assertEqual(self.get_rows(order), {self.far: 0.1, self.nearest: 0.6})
+
+    def test_new_restaurant(self):
+        order = self.create_located_order()
+        locate('Москва, Новый Арбат, 12', 55.706, 37.6)
+        restaurant = Restaurant.objects.create(name='Star Burger Арбат', address='Москва, Новый Арбат, 12')
+        # listed once it is able to cook the whole order
+        for product in self.products[:-1]:
+            RestaurantMenuItem.objects.create(restaurant=restaurant, product=product)
+        self.assertEqual(self.get_rows(order), {self.nearest: 0.6, self.near: 1.7})
+
+        RestaurantMenuItem.objects.create(restaurant=restaurant, product=self.products[-1])
+        self.assertEqual(self.get_rows(order), {restaurant.id: 0.1, self.nearest: 0.6})
+
+    def test_deleted_restaurant(self):
+        order = self.create_located_order()
+        Restaurant.objects.get(id=self.nearest).delete()
+        self.assertEqual(self.get_rows(order), {self.near: 1.7, self.far: 5.0})
+
+    def test_processed_order_rows_are_deleted(self):
+        order = self.create_located_order()
+        Order.objects.filter(id=order.id).update(status=Order.DELIVERY)
+        OrderRestaurant.objects.refresh(order_ids=[order.id])
+        self.assertEqual(self.get_rows(order), {})
+
+        # processed orders are not looked through
+        OrderRestaurant.objects.refresh()
+        self.assertEqual(self.get_rows(order), {})
+
+    def test_refresh_new_orders(self):
+        locate(self.order_address, 55.705, 37.6)
+        refreshed_order = self.create_located_order()
+        new_order = self.create_order()
+        processed_order = self.create_order()
+        Order.objects.filter(id=processed_order.id).update(status=Order.DELIVERED)
+
+        self.assertEqual(OrderRestaurant.objects.refresh_new_orders(), 1)
+        self.assertEqual(self.get_rows(new_order), {self.nearest: 0.6, self.near: 1.7})
+        self.assertEqual(self.get_rows(processed_order), {})
+        self.assertIsNone(Order.objects.get(id=processed_order.id).restaurants_refreshed_at)
+        self.assertEqual(OrderRestaurant.objects.refresh_new_orders(), 0)
+        self.assertEqual(self.get_rows(refreshed_order), {self.nearest: 0.6, self.near: 1.7})
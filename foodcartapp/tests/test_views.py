@@ -0,0 +1,108 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from foodcartapp.models import Order, Product, RestaurantMenuItem
+from foodcartapp.views import MAX_ORDERS_IN_BATCH
+
+from .base import CatalogueTestCase
+
+
+class RegisterOrdersBatchTest(CatalogueTestCase):
+    def post_batch(self, orders_data):
+        return self.client.post('/api/order/batch/', orders_data, content_type='application/json')
+
+    def test_mixed_batch(self):
+        invalid_order_data = dict(self.get_order_data(), products=[{'product': 0, 'quantity': 1}])
+        response = self.post_batch([
+            self.get_order_data(address='Москва, Арбат, 1'),
+            invalid_order_data,
+            'not an order',
+            self.get_order_data(address='Москва, Арбат, 2'),
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        self.assertEqual([result['status'] for result in results], [201, 400, 400, 201])
+        self.assertIn('products', results[1]['errors'])
+        self.assertIn('non_field_errors', results[2]['errors'])
+
+        # results are in the order of the batch
+        orders = Order.objects.order_by('id')
+        self.assertEqual([result['order']['id'] for result in [results[0], results[3]]],
+                         [order.id for order in orders])
+        self.assertEqual([order.address for order in orders], ['Москва, Арбат, 1', 'Москва, Арбат, 2'])
+        self.assertEqual(orders[0].total_price, 2 * sum(product.price for product in self.products))
+
+    def test_products_fetched_once(self):
+        batch = [self.get_order_data(address=f'Москва, Арбат, {number}') for number in range(10)]
+        with CaptureQueriesContext(connection) as context:
+            response = self.post_batch(batch)
+        self.assertEqual(response.status_code, 200)
+        products_queries = [
+            query for query in context.captured_queries
+            if query['sql'].startswith(f'SELECT "{Product._meta.db_table}"')
+        ]
+        self.assertEqual(len(products_queries), 1)
+        self.assertEqual(Order.objects.count(), 10)
+
+    def test_not_a_list(self):
+        for data in [{}, []]:
+            with self.subTest(data=data):
+                self.assertEqual(self.post_batch(data).status_code, 400)
+
+    def test_batch_size_limit(self):
+        response = self.post_batch([self.get_order_data()] * (MAX_ORDERS_IN_BATCH + 1))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+
+class ProductListApiTest(CatalogueTestCase):
+    def get_products(self, **headers):
+        return self.client.get('/api/products/', **headers)
+
+    def test_validators(self):
+        response = self.get_products()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), len(self.products))
+        self.assertTrue(response['ETag'])
+        self.assertTrue(response['Last-Modified'])
+
+        # rendered once, served from cache
+        cached_response = self.get_products()
+        self.assertEqual(cached_response['ETag'], response['ETag'])
+        self.assertEqual(cached_response['Last-Modified'], response['Last-Modified'])
+
+    def test_not_modified(self):
+        response = self.get_products()
+        for headers in [{'HTTP_IF_NONE_MATCH': response['ETag']},
+                        {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']}]:
+            with self.subTest(headers=headers):
+                not_modified_response = self.get_products(**headers)
+                self.assertEqual(not_modified_response.status_code, 304)
+                self.assertEqual(not_modified_response.content, b'')
+                self.assertEqual(not_modified_response['ETag'], response['ETag'])
+
+    def test_modified(self):
+        response = self.get_products(HTTP_IF_NONE_MATCH='"outdated"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_reset_by_product_change(self):
+        etag = self.get_products()['ETag']
+        product = Product.objects.get(id=self.products[0].id)
+        product.name = 'Чизбургер'
+        product.save()
+
+        response = self.get_products(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('Чизбургер', [product['name'] for product in response.json()])
+
+    def test_reset_by_menu_change(self):
+        etag = self.get_products()['ETag']
+        for menu_item in RestaurantMenuItem.objects.filter(product=self.products[0]):
+            menu_item.availability = False
+            menu_item.save()
+
+        response = self.get_products(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertNotIn(self.products[0].id, [product['id'] for product in response.json()])
@@ -1,30 +1,72 @@
-from django.core.cache import cache
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
 from geopy.distance import distance
-import requests
-
-
-def fetch_coordinates(apikey, place):
-    base_url = 'https://geocode-maps.yandex.ru/1.x'
-    params = {'geocode': place, 'apikey': apikey, 'format': 'json'}
-    response = requests.get(base_url, params=params)
-    response.raise_for_status()
-    places_found = response.json()['response']['GeoObjectCollection']['featureMember']
-    if not places_found:
-        return None, None
-    most_relevant = places_found[0]
-    lon, lat = most_relevant['GeoObject']['Point']['pos'].split(' ')
-    return float(lat), float(lon)
-
-
-def get_restaurant_distance(apikey, order_address, restaurant_address):
-    all_coords = []
-    for address in (order_address, restaurant_address):
-        coords = cache.get(address)
-        if coords:
-            all_coords.append(coords)
-            continue
-        coords = fetch_coordinates(apikey, address)
-        cache.set(address, coords, None)
-        all_coords.append(coords)
-
-    return round(distance(*all_coords).kilometers, 3)
+
+
+def fetch_many_coordinates(geocoder, places) -> dict:
+    """Fetch coordinates of several places, concurrently from remote geocoders.
+
+    Returns:
+        places_results: dict of place: GeocodeResult
+    """
+    places = list(set(places))
+    if not places:
+        return {}
+    if not geocoder.remote:
+        return {place: geocoder.geocode(place) for place in places}
+    max_workers = min(settings.GEOCODER_MAX_WORKERS, len(places))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Every call gets a copy of the caller context to keep request metrics
+        futures = [
+            executor.submit(contextvars.copy_context().run, geocoder.geocode, place)
+            for place in places
+        ]
+        return {place: future.result() for place, future in zip(places, futures)}
+
+
+def get_retry_delay(attempts) -> float:
+    """Get seconds to wait before next geocoding attempt, doubled on every failure."""
+    delay = settings.GEOCODER_RETRY_DELAY * 2 ** min(attempts - 1, 30)
+    return min(delay, settings.GEOCODER_MAX_RETRY_DELAY)
+
+
+ADDRESS_ABBREVIATIONS = {
+    'г': 'город',
+    'ул': 'улица',
+    'пр-т': 'проспект',
+    'просп': 'проспект',
+    'пер': 'переулок',
+    'пл': 'площадь',
+    'ш': 'шоссе',
+    'б-р': 'бульвар',
+    'бул': 'бульвар',
+    'наб': 'набережная',
+    'мкр': 'микрорайон',
+    'д': 'дом',
+    'корп': 'корпус',
+    'к': 'корпус',
+    'стр': 'строение',
+}
+# Words which are implied when omitted, "Ленина 5" is the same as "улица Ленина, дом 5"
+ADDRESS_IMPLIED_WORDS = {'город', 'улица', 'дом'}
+ADDRESS_PUNCTUATION = re.compile(r'[^\w\s/-]')
+
+
+def normalize_address(address):
+    """Normalize address to compare addresses written in different ways.
+
+    Case and "ё" are folded, punctuation is dropped, abbreviations are
+    expanded and implied words like "улица" are removed, so "ул. Ленина,
+    д. 5" and "Ленина 5" have the same normalized address.
+    """
+    address = address.casefold().replace('ё', 'е')
+    words = ADDRESS_PUNCTUATION.sub(' ', address).split()
+    words = [ADDRESS_ABBREVIATIONS.get(word, word) for word in words]
+    return ' '.join(word for word in words if word not in ADDRESS_IMPLIED_WORDS)
+
+
+def get_distance(coords_from, coords_to):
+    return round(distance(coords_from, coords_to).kilometers, 3)
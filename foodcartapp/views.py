@@ -1,12 +1,22 @@
-from django.db import transaction
+import json
+
+from django.db import IntegrityError, transaction
 from django.templatetags.static import static
-from django.http import JsonResponse
-from rest_framework.status import HTTP_201_CREATED
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_GET
+from rest_framework.status import HTTP_201_CREATED, HTTP_400_BAD_REQUEST
 from rest_framework.decorators import api_view
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
-from .models import Product, Order, OrderProduct
-from .serializers import OrderSerializer, ProductSerializer
+from .catalogue import get_product_catalogue
+from .models import IdempotencyKey, Order, OrderProduct, Product
+from .serializers import OrderSerializer
+
+
+MAX_ORDERS_IN_BATCH = 500
 
 
 def banners_list_api(request):
@@ -33,36 +43,140 @@ def banners_list_api(request):
     })
 
 
-@api_view(['GET'])
+@require_GET
 def product_list_api(request):
-    products = Product.objects.select_related('category').available()
-    serializer = ProductSerializer(products, many=True)
-    return Response(serializer.data)
-
+    catalogue = get_product_catalogue()
+    etag = quote_etag(catalogue['etag'])
+    response = get_conditional_response(request, etag=etag,
+                                        last_modified=catalogue['last_modified'])
+    if response is None:
+        response = HttpResponse(catalogue['content'], content_type='application/json')
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(catalogue['last_modified'])
+    return response
 
-@transaction.atomic
-@api_view(['POST'])
-def register_order(request):
-    serializer = OrderSerializer(data=request.data)
-    serializer.is_valid(raise_exception=True)
 
-    order = Order.objects.create(
-        firstname=serializer.validated_data['firstname'],
-        lastname=serializer.validated_data['lastname'],
-        phonenumber=serializer.validated_data['phonenumber'],
-        address=serializer.validated_data['address']
+def build_order(validated_data):
+    order = Order(
+        firstname=validated_data['firstname'],
+        lastname=validated_data['lastname'],
+        phonenumber=validated_data['phonenumber'],
+        address=validated_data['address']
     )
     order_products = [
         OrderProduct(
             product=product['product'],
             quantity=product['quantity'],
-            order=order,
             total_price=product['product'].price * product['quantity'],
         )
-        for product in serializer.validated_data['products']
+        for product in validated_data['products']
     ]
-    OrderProduct.objects.bulk_create(order_products)
+    order.total_price = sum(order_product.total_price for order_product in order_products)
+    return order, order_products
+
+
+def get_ordered_product_ids(orders_data):
+    """Collect product ids from raw orders data, skipping malformed items."""
+    product_ids = set()
+    for order_data in orders_data:
+        if not isinstance(order_data, dict) or not isinstance(order_data.get('products'), list):
+            continue
+        for order_product in order_data['products']:
+            if not isinstance(order_product, dict):
+                continue
+            try:
+                product_ids.add(int(order_product.get('product')))
+            except (TypeError, ValueError):
+                continue
+    return product_ids
+
+
+def get_stored_response(idempotency_key):
+    stored_key = IdempotencyKey.objects.get_fresh(idempotency_key)
+    if stored_key is None:
+        return None
+    return Response(json.loads(stored_key.response_body), status=stored_key.response_status)
+
+
+@api_view(['POST'])
+def register_order(request):
+    """Register an order.
+
+    Clients can send Idempotency-Key header to retry the request safely:
+    response to a repeated key is returned from the database without
+    registering the order again.
+    """
+    idempotency_key = request.headers.get('Idempotency-Key')
+    if idempotency_key:
+        if len(idempotency_key) > IdempotencyKey.MAX_LENGTH:
+            raise ValidationError(
+                f'Idempotency-Key can not be longer than {IdempotencyKey.MAX_LENGTH} characters.'
+            )
+        stored_response = get_stored_response(idempotency_key)
+        if stored_response:
+            return stored_response
+
+    serializer = OrderSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    order, order_products = build_order(serializer.validated_data)
+    if not idempotency_key:
+        Order.objects.bulk_create_with_products([(order, order_products)])
+        return Response(OrderSerializer(order).data, status=HTTP_201_CREATED)
+
+    try:
+        # the order and the key are saved together, so a retry never registers it twice
+        with transaction.atomic():
+            Order.objects.bulk_create_with_products([(order, order_products)])
+            response_data = OrderSerializer(order).data
+            IdempotencyKey.objects.create(
+                key=idempotency_key,
+                response_status=HTTP_201_CREATED,
+                response_body=json.dumps(response_data, ensure_ascii=False),
+            )
+    except IntegrityError:
+        # Concurrent retry with the same key has registered the order first
+        stored_response = get_stored_response(idempotency_key)
+        if not stored_response:
+            raise
+        return stored_response
+
+    return Response(response_data, status=HTTP_201_CREATED)
 
-    order_serializer = OrderSerializer(order)
 
-    return Response(order_serializer.data, status=HTTP_201_CREATED)
+@api_view(['POST'])
+def register_orders_batch(request):
+    """Register a batch of orders, e.g. pushed by aggregator partners.
+
+    Orders are validated together with one products query, valid ones are
+    saved even if some other orders of the batch are invalid.
+
+    Returns:
+        results: list with a result for every order of the batch in the same
+            order, {"status": 201, "order": {...}} or {"status": 400, "errors": {...}}
+    """
+    if not isinstance(request.data, list) or not request.data:
+        raise ValidationError('Expected a non-empty list of orders.')
+    if len(request.data) > MAX_ORDERS_IN_BATCH:
+        raise ValidationError(f'Batch can not contain more than {MAX_ORDERS_IN_BATCH} orders.')
+
+    products = Product.objects.in_bulk(get_ordered_product_ids(request.data))
+    serializers = [
+        OrderSerializer(data=order_data, context={'products': products})
+        for order_data in request.data
+    ]
+    orders_with_products = [
+        build_order(serializer.validated_data)
+        for serializer in serializers if serializer.is_valid()
+    ]
+    Order.objects.bulk_create_with_products(orders_with_products)
+
+    created_orders = iter(order for order, order_products in orders_with_products)
+    results = []
+    for serializer in serializers:
+        if serializer.errors:
+            results.append({'status': HTTP_400_BAD_REQUEST, 'errors': serializer.errors})
+        else:
+            order_serializer = OrderSerializer(next(created_orders))
+            results.append({'status': HTTP_201_CREATED, 'order': order_serializer.data})
+    return Response(results)
@@ -1,3 +1,92 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from foodcartapp.models import ORDERS_PER_PAGE, Order, OrderProduct, OrderRestaurant, Place, Product
+from foodcartapp.profiling import QueryBudgetExceeded
+from foodcartapp.tests.base import CatalogueTestCase
+from foodcartapp.utils import normalize_address
+
+
+class QueryPlanTest(TestCase):
+    """Check that queries of the manager pages use their indexes.
+
+    Tables of the test database are empty, so on PostgreSQL sequential scans
+    are turned off, otherwise the planner would prefer them to any index.
+    """
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, msg=f'{index_name} is not used:\n{plan}')
+
+    def test_orders_page_uses_status_index(self):
+        orders = Order.objects.with_status(Order.UNPROCESSED).order_by('id') \
+            .filter(id__gt=100)[:ORDERS_PER_PAGE + 1]
+        self.assertUsesIndex(orders, 'order_status_id_idx')
+
+    def test_orders_page_products_use_order_index(self):
+        orders = Order.objects.filter(id__in=[1, 2, 3])
+        order_products = OrderProduct.objects.filter(order__in=orders).values_list('order', 'product')
+        self.assertUsesIndex(order_products, 'orderproduct_order_product_idx')
+
+    def test_catalogue_uses_menu_items_index(self):
+        products = Product.objects.select_related('category').available()
+        self.assertUsesIndex(products, 'menuitem_product_avail_idx')
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class ManagerQueryBudgetTest(CatalogueTestCase):
+    """Manager pages fail with QueryBudgetExceeded when they exceed QUERY_BUDGETS."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.manager = User.objects.create_user('manager', password='password', is_staff=True)
+        addresses = [restaurant.address for restaurant in cls.restaurants] + \
+            [f'Москва, Арбат, {number}' for number in range(10)]
+        Place.objects.bulk_create([
+            Place(address=address, normalized_address=normalize_address(address),
+                  lat=55.75 + number / 100, lon=37.6, status=Place.FOUND)
+            for number, address in enumerate(addresses)
+        ])
+        Order.objects.bulk_create_with_products([
+            (Order(firstname='Иван', lastname='Петров', phonenumber='+79291000000',
+                   address=f'Москва, Арбат, {number}'),
+             [OrderProduct(product=product, quantity=1, total_price=product.price) for product in cls.products])
+            for number in range(20)
+        ])
+        OrderRestaurant.objects.refresh()
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.manager)
+
+    def test_view_orders(self):
+        response = self.client.get('/manager/orders/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['order_items']), 20)
+
+    def test_view_orders_after_new_order(self):
+        # restaurants of the new order are not calculated yet
+        response = self.client.post('/api/order/', self.get_order_data(address='Москва, Арбат, 1'),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        response = self.client.get('/manager/orders/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['order_items']), 21)
+        self.assertEqual(len(response.context['order_items'][-1].restaurants), len(self.restaurants))
+
+    def test_view_products(self):
+        response = self.client.get('/manager/products/')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(QUERY_BUDGETS={'view_orders_json': 0})
+    def test_streamed_queries_are_counted(self):
+        response = self.client.get('/manager/orders/json/')
+        with self.assertRaises(QueryBudgetExceeded):
+            b''.join(response.streaming_content)
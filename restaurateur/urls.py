@@ -13,6 +13,9 @@ urlpatterns = [
     path('restaurants/', views.view_restaurants, name="RestaurantView"),
 
     path('orders/', views.view_orders, name="view_orders"),
+    path('orders/json/', views.view_orders_json, name="view_orders_json"),
+
+    path('metrics/', views.view_metrics, name="view_metrics"),
 
     path('login/', views.LoginView.as_view(), name="login"),
     path('logout/', views.LogoutView.as_view(), name="logout"),
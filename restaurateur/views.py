@@ -1,5 +1,12 @@
+import json
+
 from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
 from django.views import View
 from django.urls import reverse_lazy
 from django.contrib.auth.decorators import user_passes_test
@@ -7,7 +14,13 @@ from django.contrib.auth.decorators import user_passes_test
 from django.contrib.auth import authenticate, login
 from django.contrib.auth import views as auth_views
 
-from foodcartapp.models import Product, Restaurant, Order
+from foodcartapp.availability import get_availability_matrix
+from foodcartapp.catalogue import CATALOGUE_TIMEOUT, get_catalogue_version
+from foodcartapp.models import GeocoderQuota, Order, Place, Product, Restaurant
+from foodcartapp.profiling import get_views_metrics
+
+
+PRODUCTS_PAGE_KEY = 'products_page:{}'
 
 
 class Login(forms.Form):
@@ -64,27 +77,30 @@ def is_manager(user):
 
 @user_passes_test(is_manager, login_url='restaurateur:login')
 def view_products(request):
-    restaurants = list(Restaurant.objects.order_by('name'))
-    products = list(Product.objects.prefetch_related('menu_items'))
-
-    default_availability = {restaurant.id: False for restaurant in restaurants}
-    products_with_restaurants = []
-    for product in products:
+    page_key = PRODUCTS_PAGE_KEY.format(get_catalogue_version())
+    page = cache.get(page_key)
+    if page is not None:
+        return HttpResponse(page)
 
-        availability = {
-            **default_availability,
-            **{item.restaurant_id: item.availability for item in product.menu_items.all()},
-        }
-        orderer_availability = [availability[restaurant.id] for restaurant in restaurants]
+    restaurants = list(Restaurant.objects.order_by('name'))
+    products = list(Product.objects.select_related('category'))
+    availability_matrix = get_availability_matrix(
+        [product.id for product in products],
+        [restaurant.id for restaurant in restaurants],
+    )
 
-        products_with_restaurants.append(
-            (product, orderer_availability)
-        )
+    row_size = len(restaurants)
+    products_with_restaurants = [
+        (product, availability_matrix[row * row_size:(row + 1) * row_size])
+        for row, product in enumerate(products)
+    ]
 
-    return render(request, template_name="products_list.html", context={
+    page = render_to_string(template_name="products_list.html", request=request, context={
         'products_with_restaurants': products_with_restaurants,
         'restaurants': restaurants,
     })
+    cache.set(page_key, page, CATALOGUE_TIMEOUT)
+    return HttpResponse(page)
 
 
 @user_passes_test(is_manager, login_url='restaurateur:login')
@@ -94,9 +110,88 @@ def view_restaurants(request):
     })
 
 
+def get_orders_filters(request):
+    status = request.GET.get('status', Order.UNPROCESSED)
+    try:
+        after_id = int(request.GET['after'])
+    except (KeyError, ValueError):
+        after_id = None
+    return status, after_id
+
+
 @user_passes_test(is_manager, login_url='restaurateur:login')
 def view_orders(request):
-    orders = Order.objects.all_with_restaurants()
+    status, after_id = get_orders_filters(request)
+    orders, next_after_id = Order.objects.with_status(status) \
+        .get_page_with_restaurants(after_id)
     return render(request, template_name='order_items.html', context={
-        'order_items': orders
+        'order_items': orders,
+        'status': status,
+        'statuses': Order.STATUS_CHOISES,
+        'is_first_page': after_id is None,
+        'next_after_id': next_after_id,
+    })
+
+
+def serialize_order(order):
+    return {
+        'id': order.id,
+        'status': order.status,
+        'payment_method': order.payment_method,
+        'total_price': str(order.total_price),
+        'firstname': order.firstname,
+        'lastname': order.lastname,
+        'phonenumber': order.phonenumber,
+        'address': order.address,
+        'comment': order.comment,
+        'registered_at': order.registered_at.isoformat(),
+        'restaurants': [
+            {'name': name, 'distance': distance} for name, distance in order.restaurants
+        ],
+    }
+
+
+def stream_orders_json(orders):
+    yield '['
+    for number, order in enumerate(orders):
+        if number:
+            yield ','
+        yield json.dumps(serialize_order(order), ensure_ascii=False)
+    yield ']'
+
+
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def view_orders_json(request):
+    status, after_id = get_orders_filters(request)
+    orders = Order.objects.with_status(status)
+    if after_id is not None:
+        orders = orders.filter(id__gt=after_id)
+    return StreamingHttpResponse(
+        stream_orders_json(orders.iterate_with_restaurants()),
+        content_type='application/json',
+    )
+
+
+def get_geocoder_metrics():
+    quota = GeocoderQuota.objects.get_today()
+    places_counts = dict(Place.objects.values_list('status').annotate(count=Count('id')).order_by())
+    return {
+        'day': quota.day.isoformat(),
+        'calls': quota.calls,
+        'daily_quota': settings.GEOCODER_DAILY_QUOTA,
+        'remaining_calls': quota.get_remaining_calls(),
+        'places': {
+            status_name: places_counts.get(status, 0)
+            for status, status_name in [(Place.FOUND, 'found'), (Place.NOT_FOUND, 'not_found'),
+                                        (Place.PENDING, 'pending')]
+        },
+    }
+
+
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def view_metrics(request):
+    """Show metrics of views handled by this worker process and geocoder usage."""
+    return JsonResponse({
+        'views': get_views_metrics(),
+        'geocoder': get_geocoder_metrics(),
     })